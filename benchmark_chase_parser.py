@@ -0,0 +1,841 @@
+"""
+Benchmarks for the Chase statement parser.
+
+The stage suite generates synthetic Chase-format statement PDFs and times each
+stage of the pipeline separately; the other suites compare optimized code paths
+with their straightforward reference implementations.
+
+Run directly:
+    python benchmark_chase_parser.py
+    python benchmark_chase_parser.py --suite stages --json today.json --baseline last_week.json
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import platform
+import random
+import re
+import string
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import pdfplumber
+
+from chase_statement_parser import (ChaseStatementProcessor, ColumnarFile, KeywordMatcher, LineClassifier,
+                                    PARSER_VERSION, Transaction, infer_statement_date, load_category_rules,
+                                    read_transactions_csv, recategorize_csvs,
+                                    reconcile_transactions, write_category_rules)
+
+SUITES = ['stages', 'categorize', 'validate', 'classify', 'analytics', 'records', 'rules', 'startup', 'columnar', 'reconcile', 'recategorize']
+
+
+def linear_categorize(category_keywords, description):
+    """Reference categorization: scan every keyword of every category in order."""
+    desc_upper = description.upper()
+    for category, keywords in category_keywords.items():
+        if any(keyword in desc_upper for keyword in keywords):
+            return category
+    return 'UNCATEGORIZED'
+
+
+def synthetic_keywords(base_keywords, total, seed=0):
+    """
+    Grow a keyword set to roughly `total` keywords by adding random merchant names.
+
+    Args:
+        base_keywords: The processor's category_keywords
+        total: Target number of keywords across all categories
+        seed: Random seed
+
+    Returns:
+        New dictionary with the same categories in the same order
+    """
+    rng = random.Random(seed)
+    keywords = {category: list(words) for category, words in base_keywords.items()}
+    categories = list(keywords)
+    count = sum(len(words) for words in keywords.values())
+    while count < total:
+        name = ''.join(rng.choice(string.ascii_uppercase) for _ in range(rng.randint(5, 12)))
+        keywords[rng.choice(categories)].append(name)
+        count += 1
+    return keywords
+
+
+def synthetic_descriptions(category_keywords, count, seed=1):
+    """Generate transaction descriptions, about half of which contain a known keyword."""
+    rng = random.Random(seed)
+    all_keywords = [kw for words in category_keywords.values() for kw in words]
+    descriptions = []
+    for _ in range(count):
+        store = f"#{rng.randint(100, 99999)}"
+        city = rng.choice(['SAN FRANCISCO CA', 'NEW YORK NY', 'SEATTLE WA', 'AUSTIN TX'])
+        if rng.random() < 0.5:
+            merchant = rng.choice(all_keywords)
+        else:
+            merchant = ''.join(rng.choice(string.ascii_uppercase) for _ in range(8))
+        descriptions.append(f"{merchant} {store} {city}".lower() if rng.random() < 0.2
+                            else f"{merchant} {store} {city}")
+    return descriptions
+
+
+def bench_categorize(keyword_counts, transactions):
+    """Compare linear keyword scanning with the compiled matcher across keyword set sizes."""
+    base = ChaseStatementProcessor().category_keywords
+    results = {}
+    print(f"categorize_transaction over {transactions} descriptions")
+    print(f"{'keywords':>10} {'build ms':>10} {'linear ms':>11} {'matcher ms':>11} {'speedup':>8}")
+    for total in keyword_counts:
+        keywords = synthetic_keywords(base, total)
+        descriptions = synthetic_descriptions(keywords, transactions)
+
+        processor = ChaseStatementProcessor(category_cache_size=0)
+        processor.category_keywords = keywords
+        start = time.perf_counter()
+        matcher = processor.refresh_keyword_matcher()
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        expected = [linear_categorize(keywords, desc) for desc in descriptions]
+        linear = time.perf_counter() - start
+
+        start = time.perf_counter()
+        actual = [processor.categorize_transaction(desc) for desc in descriptions]
+        compiled = time.perf_counter() - start
+
+        if actual != expected:
+            raise AssertionError(f"Matcher disagrees with linear scan at {total} keywords")
+        print(f"{matcher.keyword_count:>10} {build * 1000:>10.1f} {linear * 1000:>11.1f} "
+              f"{compiled * 1000:>11.1f} {linear / compiled:>7.1f}x")
+        results[f"categorize_{matcher.keyword_count}_keywords"] = {
+            'seconds': compiled, 'items': transactions, 'per_item_us': compiled / transactions * 1e6,
+            'reference_seconds': linear
+        }
+
+    # The cache key must never hide a keyword the full description contains
+    for desc in ['PAYPAL *SPOTIFY123 4029357733 CA', 'SQ *BLUE BOTTLE COFFEE12 OAKLAND CA',
+                 'AMAZON MKTPL*AB12 AMZN.COM', 'STARBUCKS #1234 SAN FRANCISCO CA', 'UBER *TRIP HELP.UBER.COM',
+                 'THE 20 SPOT 120 MAIN ST', '7-ELEVEN12345 AUSTIN TX']:
+        expected = linear_categorize(base, desc)
+        if ChaseStatementProcessor().categorize_transaction(desc) != expected:
+            raise AssertionError(f"Cache key changes the category of {desc!r}")
+
+    # Real statements repeat a few hundred merchants under varying store numbers and cities
+    rng = random.Random(6)
+    merchants = synthetic_descriptions(base, 300)
+    descriptions = [rng.choice(merchants).rsplit('#', 1)[0] + f"#{rng.randint(100, 99999)} AUSTIN TX"
+                    for _ in range(transactions)]
+    uncached = ChaseStatementProcessor(category_cache_size=0)
+    cached = ChaseStatementProcessor()
+    uncached.refresh_keyword_matcher()
+    cached.refresh_keyword_matcher()
+
+    start = time.perf_counter()
+    expected = [uncached.categorize_transaction(desc) for desc in descriptions]
+    plain = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = [cached.categorize_transaction(desc) for desc in descriptions]
+    memoized = time.perf_counter() - start
+
+    if actual != expected:
+        raise AssertionError("Categorization cache disagrees with the uncached matcher")
+    print(f"Categorization cache over {transactions} descriptions of 300 merchants: "
+          f"{plain * 1000:.1f} ms uncached, {memoized * 1000:.1f} ms cached "
+          f"({plain / memoized:.1f}x, hit rate {cached.category_cache.hit_rate():.1%})")
+    results['categorize_cached'] = {
+        'seconds': memoized, 'items': transactions, 'per_item_us': memoized / transactions * 1e6,
+        'reference_seconds': plain
+    }
+    return results
+
+
+def bench_rules(keyword_counts):
+    """Compare building a keyword matcher from a rules file with loading its saved compiled form."""
+    base = ChaseStatementProcessor().category_keywords
+    results = {}
+    print("Category rules startup")
+    print(f"{'keywords':>10} {'build ms':>10} {'load ms':>10} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for total in keyword_counts:
+            keywords = synthetic_keywords(base, total)
+            rules_path = os.path.join(tmp_dir, f"rules_{total}.json")
+            write_category_rules(keywords, rules_path)
+            fingerprint = KeywordMatcher.fingerprint(keywords)
+            compiled_path = f"{rules_path}.matcher"
+
+            start = time.perf_counter()
+            matcher = KeywordMatcher(load_category_rules(rules_path))
+            build = time.perf_counter() - start
+            matcher.save(compiled_path, fingerprint)
+
+            start = time.perf_counter()
+            loaded = KeywordMatcher.load(compiled_path, KeywordMatcher.fingerprint(load_category_rules(rules_path)))
+            load = time.perf_counter() - start
+
+            if loaded is None or loaded.keyword_count != matcher.keyword_count:
+                raise AssertionError(f"Compiled rules did not load back at {total} keywords")
+            print(f"{matcher.keyword_count:>10} {build * 1000:>10.1f} {load * 1000:>10.1f} {build / load:>7.1f}x")
+            results[f"rules_load_{matcher.keyword_count}_keywords"] = {
+                'seconds': load, 'items': matcher.keyword_count,
+                'per_item_us': load / matcher.keyword_count * 1e6, 'reference_seconds': build
+            }
+    return results
+
+
+# Startup budget for commands that never open a PDF
+STARTUP_BUDGET_SECONDS = 0.1
+
+
+def bench_startup(repeat):
+    """Time CLI commands that never open a PDF, via the entry script, against an import with pdfplumber loaded eagerly."""
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'parse_chase_statements.py')
+    results = {}
+    print(f"CLI startup, best of {repeat} runs, budget {STARTUP_BUDGET_SECONDS * 1000:.0f} ms")
+    print(f"{'command':>14} {'eager ms':>10} {'lazy ms':>10} {'budget':>8}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_path = os.path.join(tmp_dir, 'statement.csv')
+        write_csv_rows(synthetic_csv_rows(500), csv_path)
+
+        def run(*command):
+            subprocess.run([sys.executable, *command], check=True, cwd=tmp_dir,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        eager = time_best(lambda: run('-c', f"import pdfplumber; import sys; sys.path.insert(0, "
+                                            f"{os.path.dirname(script)!r}); import chase_statement_parser"),
+                          repeat)[0]
+        commands = {
+            'help': ['--help'],
+            'validate': ['validate', csv_path, csv_path],
+            'recategorize': ['recategorize', csv_path, '--dest_dir', os.path.join(tmp_dir, 'out')],
+        }
+        for name, arguments in commands.items():
+            seconds = time_best(lambda: run(script, *arguments), repeat)[0]
+            verdict = 'ok' if seconds < STARTUP_BUDGET_SECONDS else 'OVER'
+            print(f"{name:>14} {eager * 1000:>10.1f} {seconds * 1000:>10.1f} {verdict:>8}")
+            results[f"startup_{name}"] = {
+                'seconds': seconds, 'items': 1, 'per_item_us': seconds * 1e6, 'reference_seconds': eager
+            }
+    return results
+
+
+def nested_loop_validate(our_rows, chase_rows):
+    """Reference validation: compare every row with every row on the other side."""
+    def same(a, b):
+        return (a.get('Transaction Date', '') == b.get('Transaction Date', '') and
+                a.get('Description', '') == b.get('Description', '') and
+                a.get('Amount', '') == b.get('Amount', ''))
+
+    missing_in_ours = [c for c in chase_rows if not any(same(o, c) for o in our_rows)]
+    missing_in_chase = [o for o in our_rows if not any(same(o, c) for c in chase_rows)]
+    return missing_in_ours, missing_in_chase
+
+
+def synthetic_csv_rows(count, seed=2):
+    """Generate distinct rows in export_to_csv format."""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        date = f"{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}"
+        rows.append({
+            'Transaction Date': date,
+            'Post Date': date,
+            'Description': f"MERCHANT {i} #{rng.randint(100, 9999)}",
+            'Category': 'UNCATEGORIZED',
+            'Type': 'Purchase',
+            'Amount': f"${rng.randint(1, 99999) / 100:.2f}"
+        })
+    return rows
+
+
+def write_csv_rows(rows, path):
+    with open(path, 'w', newline='') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def bench_validate(sizes):
+    """Compare nested-loop validation with the hash-join validate_against_chase_csv."""
+    processor = ChaseStatementProcessor()
+    results = {}
+    print("validate_against_chase_csv, 1% of rows differing on each side")
+    print(f"{'rows':>10} {'nested ms':>11} {'hashed ms':>11} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in sizes:
+            rows = synthetic_csv_rows(size + size // 100 * 2)
+            extra = size // 100
+            our_rows = rows[:size]
+            chase_rows = rows[extra:size + extra]
+            our_path = os.path.join(tmp_dir, 'ours.csv')
+            chase_path = os.path.join(tmp_dir, 'chase.csv')
+            write_csv_rows(our_rows, our_path)
+            write_csv_rows(chase_rows, chase_path)
+
+            start = time.perf_counter()
+            expected = nested_loop_validate(our_rows, chase_rows)
+            nested = time.perf_counter() - start
+
+            start = time.perf_counter()
+            validation = processor.validate_against_chase_csv(our_path, chase_path)
+            hashed = time.perf_counter() - start
+
+            if (validation['missing_in_ours'], validation['missing_in_chase']) != expected:
+                raise AssertionError(f"Hash join disagrees with nested loop at {size} rows")
+            print(f"{size:>10} {nested * 1000:>11.1f} {hashed * 1000:>11.1f} {nested / hashed:>7.1f}x")
+            results[f"validate_{size}_rows"] = {
+                'seconds': hashed, 'items': size, 'per_item_us': hashed / size * 1e6,
+                'reference_seconds': nested
+            }
+    return results
+
+
+def chase_export_rows(rows, seed=3):
+    """Turn export_to_csv rows into a Chase-style export that only fuzzily matches them."""
+    rng = random.Random(seed)
+    chase_rows = []
+    for row in rows:
+        month, day = (int(part) for part in row['Transaction Date'].split('/'))
+        if rng.random() < 0.3:
+            day = min(day + rng.randint(1, 2), 28)  # Posted a day or two later
+        description = row['Description']
+        if rng.random() < 0.3:
+            description = description[:max(8, len(description) - rng.randint(1, 6))]  # Truncated
+        chase_rows.append(dict(row, **{'Transaction Date': f"{month:02d}/{day:02d}/2024",
+                                       'Description': '  '.join(description.split()),
+                                       'Amount': '-' + row['Amount'].lstrip('$')}))
+    rng.shuffle(chase_rows)
+    return chase_rows
+
+
+def bench_reconcile(sizes):
+    """Time reconciling fuzzily matching exports, to check the cost grows linearly with the rows."""
+    results = {}
+    print("reconcile_transactions, 3-day window, every row perturbed in format and ~half in content")
+    print(f"{'rows':>10} {'ms':>10} {'us/row':>10} {'matched':>9}")
+    for size in sizes:
+        our_rows = synthetic_csv_rows(size)
+        chase_rows = chase_export_rows(our_rows)
+        start = time.perf_counter()
+        pairs, unmatched_chase, unmatched_ours = reconcile_transactions(chase_rows, our_rows, 3)
+        seconds = time.perf_counter() - start
+        print(f"{size:>10} {seconds * 1000:>10.1f} {seconds / size * 1e6:>10.1f} {len(pairs) / size:>8.1%}")
+        results[f"reconcile_{size}_rows"] = {'seconds': seconds, 'items': size, 'per_item_us': seconds / size * 1e6}
+    return results
+
+
+def legacy_classify(line):
+    """Reference line classification: the sequential re.search checks parse_pdf used to run."""
+    for header, section in LineClassifier.SECTION_HEADERS:
+        if re.search(header, line, re.IGNORECASE):
+            return LineClassifier.HEADER, section
+    if not re.search(LineClassifier.DATE_PATTERN, line):
+        return LineClassifier.IGNORE, None
+    for pattern, negate in LineClassifier.TRANSACTION_PATTERNS:
+        match = re.search(pattern, line)
+        if match:
+            date, description, amount_str = match.groups()
+            amount = round(float(amount_str.replace('$', '').replace(',', '')) * 100)
+            return LineClassifier.TRANSACTION, (date, description.strip(), -amount if negate else amount)
+    return LineClassifier.REJECTED, None
+
+
+def synthetic_lines(count, seed=3):
+    """Generate statement text lines: mostly transactions, plus headers and boilerplate."""
+    rng = random.Random(seed)
+    merchants = ['STARBUCKS #1234 SAN FRANCISCO CA', 'UBER *TRIP HELP.UBER.COM', 'Payment Thank You - Web',
+                 'AMAZON MKTPL*AB12CD34 AMZN.COM/BILL WA', 'WHOLEFDS SFO 10234', 'LATE FEE']
+    boilerplate = ['Manage your account online at www.chase.com', 'Page 2 of 4',
+                   'Total fees charged in 2024 $0.00', 'ACCOUNT SUMMARY 01/01/24 - 01/31/24',
+                   'Interest Charge Calculation', 'purchases and balance transfers']
+    headers = [header for header, section in LineClassifier.SECTION_HEADERS]
+    lines = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.05:
+            lines.append(rng.choice(headers))
+        elif roll < 0.3:
+            lines.append(rng.choice(boilerplate))
+        else:
+            date = f"{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}"
+            amount = rng.choice(['{:,.2f}', '${:,.2f}', '-{:,.2f}', '-${:,.2f}', '${:,.2f} ', '{:.0f}'])
+            lines.append(f"{date} {rng.choice(merchants)} {amount.format(rng.randint(1, 500000) / 100)}")
+    return lines
+
+
+def bench_line_classifier(count):
+    """Compare per-line cost of the sequential regex checks with the precompiled classifier."""
+    # Empty descriptions followed by several spaces, where a later format can also match
+    lines = synthetic_lines(count) + ['01/15  $25.00  1,234.56', '01/15   $25.00   12.00']
+    classifier = LineClassifier()
+
+    start = time.perf_counter()
+    expected = [legacy_classify(line) for line in lines]
+    legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = [classifier.classify(line) for line in lines]
+    compiled = time.perf_counter() - start
+
+    if actual != expected:
+        raise AssertionError("Line classifier disagrees with sequential regex checks")
+    print(f"Line classification over {count} lines")
+    print(f"{'':>10} {'legacy us/line':>15} {'classifier us/line':>19} {'speedup':>8}")
+    print(f"{'':>10} {legacy / count * 1e6:>15.2f} {compiled / count * 1e6:>19.2f} {legacy / compiled:>7.1f}x")
+    return {'classify_lines': {'seconds': compiled, 'items': count, 'per_item_us': compiled / count * 1e6,
+                               'reference_seconds': legacy}}
+
+
+def bench_analytics(count, seed=5):
+    """Time the vectorized spending summaries over a synthetic table of count transactions."""
+    import numpy as np
+    from spending_analytics import TransactionTable
+
+    rng = np.random.default_rng(seed)
+    categories = list(ChaseStatementProcessor().category_keywords) + ['UNCATEGORIZED']
+    types = ['Purchase', 'Payment', 'Return', 'Fee', 'Adjustment']
+    merchants = [f"MERCHANT {i}" for i in range(5000)]
+    table = TransactionTable(rng.integers(2020, 2025, count).astype(np.int16),
+                             rng.integers(1, 13, count).astype(np.int8),
+                             rng.integers(1, 29, count).astype(np.int8),
+                             rng.integers(1, 500000, count).astype(np.int64),
+                             rng.integers(0, len(categories), count).astype(np.int32),
+                             rng.choice(len(types), count, p=[0.85, 0.05, 0.05, 0.03, 0.02]).astype(np.int32),
+                             rng.integers(0, len(merchants), count).astype(np.int32),
+                             categories, types, merchants)
+
+    # Reference: a plain dictionary group-by, as done by hand before
+    start = time.perf_counter()
+    expected = {}
+    purchase = types.index('Purchase')
+    for code, type_code, cents in zip(table.category_code.tolist(), table.type_code.tolist(),
+                                      table.amount_cents.tolist()):
+        if type_code == purchase:
+            expected[categories[code]] = expected.get(categories[code], 0) + cents
+    reference = time.perf_counter() - start
+
+    results = {}
+    timings = {}
+    for name, func in [('category_totals', table.category_totals), ('monthly_totals', table.monthly_totals),
+                       ('running_balance', table.running_balance), ('top_merchants', table.top_merchants)]:
+        timings[name] = time_best(func, 3)[0]
+    actual = {category: round(total * 100) for category, total, _ in table.category_totals()}
+    if actual != expected:
+        raise AssertionError("Vectorized category totals disagree with the dictionary group-by")
+
+    print(f"Spending analytics over {count} transactions (dictionary group-by: {reference * 1000:.1f} ms)")
+    print(f"{'summary':<20} {'ms':>10}")
+    for name, seconds in timings.items():
+        print(f"{name:<20} {seconds * 1000:>10.1f}")
+        results[f"analytics_{name}"] = {'seconds': seconds, 'items': count, 'per_item_us': seconds / count * 1e6}
+    results['analytics_category_totals']['reference_seconds'] = reference
+    return results
+
+
+def bench_columnar(count, statements=60):
+    """Compare loading a multi-year archive into a TransactionTable from CSVs and from a columnar file."""
+    from spending_analytics import TransactionTable
+
+    rows = synthetic_csv_rows(count)
+    per_statement = -(-count // statements)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_paths = []
+        for index in range(statements):
+            year, month = 2020 + index // 12, index % 12 + 1
+            path = os.path.join(tmp_dir, f"{year}{month:02d}28-statements.csv")
+            chunk = rows[index * per_statement:(index + 1) * per_statement]
+            if chunk:
+                write_csv_rows(chunk, path)
+                csv_paths.append(path)
+        columnar_path = os.path.join(tmp_dir, 'archive.col')
+        ColumnarFile.write([(read_transactions_csv(path), infer_statement_date(path)) for path in csv_paths],
+                           columnar_path)
+
+        from_csv, csv_table = time_best(lambda: TransactionTable.from_csv_files(csv_paths), 3)
+        from_columnar, columnar_table = time_best(lambda: TransactionTable.from_columnar(columnar_path), 3)
+        if csv_table.category_totals() != columnar_table.category_totals() or \
+                csv_table.monthly_totals()[0] != columnar_table.monthly_totals()[0]:
+            raise AssertionError("Columnar archive disagrees with the CSVs")
+        csv_bytes = sum(os.path.getsize(path) for path in csv_paths)
+        columnar_bytes = os.path.getsize(columnar_path)
+
+    print(f"Loading {count} transactions from {len(csv_paths)} statements")
+    print(f"{'':>10} {'CSV ms':>10} {'columnar ms':>12} {'speedup':>8} {'CSV MB':>8} {'columnar MB':>12}")
+    print(f"{'':>10} {from_csv * 1000:>10.1f} {from_columnar * 1000:>12.1f} {from_csv / from_columnar:>7.1f}x "
+          f"{csv_bytes / 1e6:>8.1f} {columnar_bytes / 1e6:>12.1f}")
+    return {'columnar_load': {'seconds': from_columnar, 'items': count, 'per_item_us': from_columnar / count * 1e6,
+                              'reference_seconds': from_csv}}
+
+
+def per_row_recategorize(processor, csv_path):
+    """Reference recategorization: categorize every row's description on its own."""
+    with open(csv_path, newline='') as f:
+        rows = list(csv.DictReader(f))
+    for row in rows:
+        if row['Type'] in ('Purchase', 'Return'):
+            row['Category'] = processor.categorize_transaction(row['Description'])
+    write_csv_rows(rows, csv_path)
+
+
+def bench_recategorize(files, rows_per_file=120, seed=4):
+    """Compare per-row recategorization of an archive with the chunked, memoized recategorize_csvs."""
+    rng = random.Random(seed)
+    keywords = [keyword for words in ChaseStatementProcessor().category_keywords.values() for keyword in words]
+    descriptions = [f"{rng.choice(keywords)} #{rng.randint(100, 9999)} {rng.choice(['CA', 'NY', 'TX'])}"
+                    for _ in range(3000)]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_paths = []
+        for index in range(files):
+            rows = synthetic_csv_rows(rows_per_file, seed=index)
+            for row in rows:
+                row['Description'] = rng.choice(descriptions)
+            path = os.path.join(tmp_dir, f"statement_{index}.csv")
+            write_csv_rows(rows, path)
+            csv_paths.append(path)
+
+        plain = ChaseStatementProcessor(category_cache_size=0)
+        start = time.perf_counter()
+        for path in csv_paths:
+            per_row_recategorize(plain, path)
+        reference = time.perf_counter() - start
+
+        # Reverse every category so the bulk run has to rewrite every file
+        for path in csv_paths:
+            with open(path, newline='') as f:
+                rows = list(csv.DictReader(f))
+            for row in rows:
+                row['Category'] = row['Category'][::-1]
+            write_csv_rows(rows, path)
+        start = time.perf_counter()
+        counts = recategorize_csvs(ChaseStatementProcessor(), [(path, None) for path in csv_paths])
+        bulk = time.perf_counter() - start
+        if sum(changed for _, changed in counts) != files * rows_per_file:
+            raise AssertionError("Bulk recategorization did not rewrite every category")
+
+    total = files * rows_per_file
+    print(f"Recategorizing {files} CSV files of {rows_per_file} rows")
+    print(f"{'':>10} {'per-row ms':>11} {'bulk ms':>10} {'speedup':>8}")
+    print(f"{'':>10} {reference * 1000:>11.1f} {bulk * 1000:>10.1f} {reference / bulk:>7.1f}x")
+    return {'recategorize_archive': {'seconds': bulk, 'items': total, 'per_item_us': bulk / total * 1e6,
+                                     'reference_seconds': reference}}
+
+
+def bench_records(count):
+    """Compare memory per transaction of the old per-row dictionaries with Transaction records."""
+    classifier = LineClassifier()
+    parsed = [classifier.parse_transaction(line) for line in synthetic_lines(count * 2)]
+    parsed = [value for value in parsed if value is not None][:count]
+    categories = ['UNCATEGORIZED', 'FOOD_DINING', 'TRANSPORT', 'GROCERIES']
+
+    def build_dicts():
+        return [{'date': date, 'description': description, 'amount': cents / 100, 'type': 'Purchase',
+                 'category': categories[i % len(categories)]}
+                for i, (date, description, cents) in enumerate(parsed)]
+
+    def build_records():
+        return [Transaction(date, description, cents, 'Purchase', categories[i % len(categories)])
+                for i, (date, description, cents) in enumerate(parsed)]
+
+    results = {}
+    print(f"Transaction storage over {len(parsed)} rows (descriptions and dates excluded)")
+    print(f"{'layout':<10} {'bytes/row':>10} {'build us/row':>13}")
+    for name, build in [('dict', build_dicts), ('record', build_records)]:
+        tracemalloc.start()
+        rows = build()
+        allocated = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del rows
+        seconds, _ = time_best(build, 3)
+        print(f"{name:<10} {allocated / len(parsed):>10.1f} {seconds / len(parsed) * 1e6:>13.2f}")
+        results[f"records_{name}"] = {'seconds': seconds, 'items': len(parsed),
+                                      'per_item_us': seconds / len(parsed) * 1e6,
+                                      'bytes_per_item': allocated / len(parsed)}
+    return results
+
+
+def pdf_string(text):
+    """Escape text for a PDF literal string."""
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def write_statement_pdf(pages, path):
+    """
+    Write a minimal PDF with one line of Courier text per statement line.
+
+    Args:
+        pages: List of pages, each a list of text lines
+        path: Path to write the PDF
+    """
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Courier >>"]
+    page_ids = []
+    for lines in pages:
+        ops = ["BT /F1 8 Tf 10 TL 36 770 Td"]
+        ops.extend(f"({pdf_string(line)}) Tj T*" for line in lines)
+        ops.append("ET")
+        stream = "\n".join(ops).encode('latin-1')
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id)
+        page_ids.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+
+    with open(path, 'wb') as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, 1):
+            offsets.append(f.tell())
+            f.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+        xref = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        f.write(b"".join(b"%010d 00000 n \n" % offset for offset in offsets))
+        f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+
+
+def synthetic_statement_pages(page_count, lines_per_page, seed=4):
+    """
+    Generate the text of a Chase-format statement.
+
+    The first page opens the account activity with payments and purchases,
+    continuation pages carry more purchases, and the last page holds the fees,
+    interest and adjustments sections followed by the year-to-date totals.
+
+    Returns:
+        List of pages, each a list of text lines
+    """
+    rng = random.Random(seed)
+    merchants = ['STARBUCKS #1234 SAN FRANCISCO CA', 'UBER *TRIP HELP.UBER.COM',
+                 'AMAZON MKTPL*AB12CD34 AMZN.COM/BILL WA', 'WHOLEFDS SFO 10234', 'SPOTIFY USA',
+                 'ATT*BILL PAYMENT 800-288-2020 TX', 'NETFLIX.COM', 'LOCAL HARDWARE CO', 'SQ *UNKNOWN VENDOR']
+    amount_formats = ['{:,.2f}', '${:,.2f}', '{:.2f}']
+
+    def purchase():
+        date = f"{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}"
+        amount = rng.choice(amount_formats).format(rng.randint(100, 250000) / 100)
+        return f"{date} {rng.choice(merchants)} {amount}"
+
+    pages = []
+    for page_num in range(page_count):
+        lines = ['Manage your account online at www.chase.com', f"Page {page_num + 1} of {page_count}"]
+        if page_num == 0:
+            lines += ['ACCOUNT ACTIVITY', 'PAYMENTS AND OTHER CREDITS',
+                      '01/03 Payment Thank You - Web -1,234.56', '01/04 AMAZON MKTPL RETURN -25.00',
+                      'PURCHASES']
+        else:
+            lines.append('ACCOUNT ACTIVITY (CONTINUED)')
+        while len(lines) < lines_per_page:
+            lines.append(purchase())
+        if page_num == page_count - 1:
+            lines += ['FEES CHARGED', '01/20 LATE FEE 39.00', 'INTEREST CHARGED',
+                      '01/31 PURCHASE INTEREST CHARGE 12.34', 'ADJUSTMENTS', '01/22 ADJ CREDIT -5.00',
+                      '2024 Totals Year-to-Date', 'Total fees charged in 2024 $39.00']
+        pages.append(lines)
+    return pages
+
+
+def time_best(func, repeat):
+    """Run func repeat times and return (best wall seconds, last result)."""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best, result
+
+
+def stage_result(seconds, items, unit):
+    return {'seconds': seconds, 'items': items, 'unit': unit,
+            'per_item_us': seconds / items * 1e6 if items else None}
+
+
+def bench_stages(page_count, lines_per_page, repeat):
+    """
+    Time each stage of the statement pipeline on a synthetic statement PDF.
+
+    Args:
+        page_count: Number of statement pages
+        lines_per_page: Number of text lines per page
+        repeat: Runs per stage; the fastest is reported
+
+    Returns:
+        Dictionary mapping stage name to its timing result
+    """
+    processor = ChaseStatementProcessor()
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_path = os.path.join(tmp_dir, 'statement.pdf')
+        write_statement_pdf(synthetic_statement_pages(page_count, lines_per_page), pdf_path)
+
+        # page.extract_text, with each page's cached objects released in between runs
+        def extract():
+            with pdfplumber.open(pdf_path) as pdf:
+                texts = []
+                for page in pdf.pages:
+                    texts.append(page.extract_text())
+                    page.close()
+                return texts
+        seconds, texts = time_best(extract, repeat)
+        results['extract_text'] = stage_result(seconds, len(texts), 'page')
+
+        page_lines = [text.split('\n') for text in texts]
+        line_count = sum(len(lines) for lines in page_lines)
+
+        # Section state machine and line loop of parse_pdf, including categorization
+        def parse_lines():
+            transactions = []
+            current_section = None
+            for lines in page_lines:
+                page_transactions, current_section = processor._parse_lines(lines, current_section)
+                transactions.extend(page_transactions)
+            return transactions
+        seconds, transactions = time_best(parse_lines, repeat)
+        results['parse_lines'] = stage_result(seconds, line_count, 'line')
+
+        dated_lines = [line for lines in page_lines for line in lines
+                       if re.search(LineClassifier.DATE_PATTERN, line)]
+        seconds, _ = time_best(lambda: [processor._parse_transaction_line(line) for line in dated_lines], repeat)
+        results['parse_transaction_line'] = stage_result(seconds, len(dated_lines), 'line')
+
+        descriptions = [transaction.description for transaction in transactions]
+        seconds, _ = time_best(lambda: [processor.categorize_transaction(desc) for desc in descriptions], repeat)
+        results['categorize_transaction'] = stage_result(seconds, len(descriptions), 'transaction')
+
+        our_path = os.path.join(tmp_dir, 'ours.csv')
+        seconds, _ = time_best(lambda: processor.export_to_csv(transactions, our_path), repeat)
+        results['export_to_csv'] = stage_result(seconds, len(transactions), 'transaction')
+
+        # Validate against a copy missing one row and carrying one extra row
+        with open(our_path, newline='') as csvfile:
+            rows = list(csv.DictReader(csvfile))
+        chase_rows = rows[1:] + [dict(rows[0], Description='EXTRA CHASE ROW')]
+        chase_path = os.path.join(tmp_dir, 'chase.csv')
+        write_csv_rows(chase_rows, chase_path)
+        seconds, _ = time_best(lambda: processor.validate_against_chase_csv(our_path, chase_path), repeat)
+        results['validate_against_chase_csv'] = stage_result(seconds, len(rows), 'row')
+
+    print(f"Pipeline stages on a {page_count}-page synthetic statement "
+          f"({line_count} lines, {len(transactions)} transactions), best of {repeat}")
+    print(f"{'stage':<28} {'total ms':>10} {'items':>8} {'us/item':>10}")
+    for name, result in results.items():
+        print(f"{name:<28} {result['seconds'] * 1000:>10.1f} {result['items']:>8} "
+              f"{result['per_item_us']:>10.2f}")
+    return results
+
+
+def compare_results(results, baseline, threshold):
+    """
+    Compare per-item timings with a baseline run.
+
+    Args:
+        results: Benchmark results of this run
+        baseline: Results loaded from a previous JSON report
+        threshold: Relative slowdown above which a benchmark counts as a regression
+
+    Returns:
+        List of names of regressed benchmarks
+    """
+    regressions = []
+    print(f"Comparison with baseline (regression threshold {threshold:.0%})")
+    print(f"{'benchmark':<36} {'baseline us':>12} {'current us':>12} {'change':>8}")
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if not previous or not previous.get('per_item_us') or result.get('per_item_us') is None:
+            continue
+        change = result['per_item_us'] / previous['per_item_us'] - 1
+        flag = ''
+        if change > threshold:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f"{name:<36} {previous['per_item_us']:>12.2f} {result['per_item_us']:>12.2f} "
+              f"{change:>+7.0%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Chase statement parser')
+    parser.add_argument('--suite', choices=SUITES + ['all'], nargs='+', default=['all'],
+                        help='Benchmark suites to run (default: all)')
+    parser.add_argument('--pages', '-p', type=int, default=20,
+                        help='Pages in the synthetic statement for the stage suite')
+    parser.add_argument('--lines_per_page', type=int, default=60,
+                        help='Text lines per synthetic statement page')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Runs per stage; the fastest is reported')
+    parser.add_argument('--transactions', '-n', type=int, default=5000,
+                        help='Number of synthetic transactions')
+    parser.add_argument('--keywords', '-k', type=int, nargs='+', default=[300, 1000, 3000, 10000],
+                        help='Keyword set sizes to benchmark')
+    parser.add_argument('--rows', '-r', type=int, nargs='+', default=[500, 2000, 5000],
+                        help='CSV sizes to benchmark validation with')
+    parser.add_argument('--lines', '-l', type=int, default=100000,
+                        help='Number of synthetic statement lines to classify')
+    parser.add_argument('--analytics_rows', type=int, default=2000000,
+                        help='Number of synthetic transactions for the analytics suite')
+    parser.add_argument('--json', help='Write results to this JSON file')
+    parser.add_argument('--baseline', help='JSON results of a previous run to compare against')
+    parser.add_argument('--threshold', type=float, default=0.15,
+                        help='Relative slowdown flagged as a regression (default: 0.15)')
+    args = parser.parse_args()
+    logging.getLogger('chase_statement_parser').setLevel(logging.ERROR)
+
+    suites = SUITES if 'all' in args.suite else args.suite
+    results = {}
+    for suite in suites:
+        if suite == 'stages':
+            results.update(bench_stages(args.pages, args.lines_per_page, args.repeat))
+        elif suite == 'categorize':
+            results.update(bench_categorize(args.keywords, args.transactions))
+        elif suite == 'validate':
+            results.update(bench_validate(args.rows))
+        elif suite == 'classify':
+            results.update(bench_line_classifier(args.lines))
+        elif suite == 'analytics':
+            results.update(bench_analytics(args.analytics_rows))
+        elif suite == 'rules':
+            results.update(bench_rules(args.keywords))
+        elif suite == 'columnar':
+            results.update(bench_columnar(args.transactions * 40))
+        elif suite == 'reconcile':
+            results.update(bench_reconcile(args.rows + [args.rows[-1] * 4]))
+        elif suite == 'recategorize':
+            results.update(bench_recategorize(args.transactions // 5))
+        elif suite == 'startup':
+            results.update(bench_startup(max(args.repeat, 5)))
+        elif suite == 'records':
+            results.update(bench_records(args.transactions * 20))
+        print()
+
+    if args.json:
+        report = {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'parser_version': PARSER_VERSION,
+            'settings': {key: value for key, value in vars(args).items()
+                         if key not in ('json', 'baseline', 'threshold')},
+            'results': results
+        }
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote results to {args.json}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        if compare_results(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -1,93 +1,1988 @@
-import pdfplumber
+# pdfplumber and pdfminer are imported where a PDF is opened, and the heavier
+# standard library modules where they are used, so CSV-only commands and
+# --help start without loading them
 import csv
 import re
 import argparse
 import os
+import json
+import time
+import hashlib
+import heapq
+import bisect
+import struct
 import logging
-from datetime import datetime
+from array import array
+from collections import Counter, OrderedDict, deque
+from itertools import islice
+import sys
+from contextlib import contextmanager, nullcontext
+from datetime import date, datetime
+from types import MappingProxyType
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Version of the extraction logic; bump it whenever parsing output can change
+# so that cached statements are re-parsed
+PARSER_VERSION = '5'
+
+# Default category keywords for transaction classification, in priority order;
+# the first category with a keyword in the description wins
+DEFAULT_CATEGORY_KEYWORDS = {
+    'FOOD_DINING': [
+        'RESTAURANT', 'CAFE', 'COFFEE', 'DINER', 'BISTRO', 'GRILL', 'BURGER', 'PIZZA', 'SUSHI',
+        'TACO', 'THAI', 'CHINESE', 'ITALIAN', 'MEXICAN', 'JAPANESE', 'BBQ', 'STEAKHOUSE',
+        'DOORDASH', 'GRUBHUB', 'UBEREATS', 'SEAMLESS', 'POSTMATES', 'BAR', 'PUB', 'BREWERY',
+        'MCDONALD', 'WENDY', 'CHIPOTLE', 'PANERA', 'STARBUCKS', 'DUNKIN', 'PHO', 'BANH MI',
+        'BLUESTONE LANE'
+    ],
+    'GROCERIES': [
+        'WHOLE FOODS', 'WHOLEFDS', 'SAFEWAY', 'GROCERY', 'MARKET', 'SUPERMARKET', 'TRADER JOE', 'KROGER',
+        'ALBERTSONS', 'PUBLIX', 'ALDI', 'WEGMANS', 'COSTCO', 'FOOD LION', 'GIANT', 'MEIJER',
+        'VONS', 'SHOPRITE', 'SPROUTS', 'FRESH MARKET', 'ORGANIC', 'FARMERS MARKET', 'SEES CANDY',
+        'BI-RITE MARKET', 'RAINBOW GROCERY', 'DRAEGER\'S', 'TRADE COFFEE'
+    ],
+    'HOUSEHOLD_GOODS': [
+        'TARGET', 'AMAZON', 'WALGREENS', 'CVS', 'HOME DEPOT', 'LOWE\'S', 'BED BATH',
+        'IKEA', 'WAYFAIR', 'HARDWARE', 'CONTAINER STORE', 'CRATE BARREL', 'WILLIAM SONOMA',
+        'POTTERY BARN', 'BATH BODY WORKS', 'WALMART', 'COSTCO', 'BJ\'S', 'SAM\'S CLUB',
+        'UPS STORE', 'JACK\'S LAUNDRY', 'LAUNDRY'
+    ],
+    'WELLNESS': [
+        'MASSAGE', 'SPA', 'NAIL', 'SALON', 'BEAUTY', 'FACIAL', 'WAXING', 'MANICURE',
+        'PEDICURE', 'HAIR', 'BARBER', 'STYLIST', 'COSMETIC', 'ESTHETICIAN', 'SKIN CARE'
+    ],
+    'ACTIVITIES': [
+        'DOJO', 'GYM', 'FITNESS', 'SPORT', 'RECREATION', 'YOGA', 'PILATES', 'CROSSFIT',
+        'CYCLING', 'DANCE', 'CLIMBING', 'MARTIAL ARTS', 'POOL', 'TENNIS', 'GOLF',
+        'BOWLING', 'MUSEUM', 'THEATER', 'CINEMA', 'MOVIE', 'CONCERT', 'AQUARIUM', 'ZOO',
+        'SHIVWORKS', 'SAN FRANCISCO REC & PARKS'
+    ],
+    'SHOPPING': [
+        'CLOTHING', 'RETAIL', 'DEPARTMENT', 'STORE', 'BOUTIQUE', 'MACY', 'NORDSTROM', 
+        'SHOES', 'APPAREL', 'FASHION', 'OUTLET', 'MALL', 'FOOTWEAR', 'ACCESSORY', 'JEWELRY',
+        'WATCH', 'HANDBAG', 'NIKE', 'ADIDAS', 'GAP', 'ZARA', 'H&M', 'OLD NAVY', 'J CREW',
+        'LLBEAN', 'LULULEMON', 'SEPHORA', 'NEIMANMARCUS', 'ALO-YOGA',
+        'WILSON SPORTING', 'BODEN', 'VUORI', '20 SPOT'
+    ],
+    'TRANSPORT': [
+        'UBER', 'LYFT', 'TAXI', 'TRANSIT', 'SUBWAY', 'BUS', 'TRAIN', 'TRANSPORT',
+        'METRO', 'RAIL', 'COMMUTER', 'FERRY', 'TROLLEY', 'PARKING', 'GARAGE', 'TOLL',
+        'GAS', 'FUEL', 'CHARGING', 'CAR WASH', 'AUTO', 'VEHICLE', 'STATE FARM', 
+        'CLIPPER', 'SFMTA', 'PARKMOBILE', 'CALTRAIN'
+    ],
+    'SUBSCRIPTIONS': [
+        'SPOTIFY', 'SUBSCRIPTION', 'MONTHLY', 'DIGITAL', 'SERVICE',
+        'APPLE', 'GOOGLE', 'AMAZON PRIME', 'DISNEY+', 'HBO', 'AUDIBLE', 'XBOX', 'PLAYSTATION',
+        'NINTENDO', 'NEWSPAPER', 'MAGAZINE', 'JOURNAL', 'APP', 'SOFTWARE', 'CLOUD',
+        'CHATGPT', 'EXPRESSVPN', 'NYTIMES', 'BUSINESS INSIDER'
+    ],
+    'HEALTH': [
+        'MEDICAL', 'PHARMACY', 'CLINIC', 'DOCTOR', 'HOSPITAL', 'DENTIST', 'HEALTH',
+        'PHYSICIAN', 'OPTOMETRIST', 'OPTICAL', 'GLASSES', 'CONTACTS', 'THERAPY', 'COUNSELING',
+        'LABORATORY', 'TEST', 'IMAGING', 'SPECIALIST', 'EMERGENCY', 'AMBULANCE', 'PRESCRIPTION',
+        'ONEMED'
+    ],
+    'UTILITIES': [
+        'BILL', 'INSURANCE', 'PHONE', 'INTERNET', 'UTILITY', 'ELECTRIC', 'GAS', 'WATER',
+        'SEWER', 'TRASH', 'WIRELESS', 'CABLE', 'SATELLITE', 'TV', 'STREAMING', 'CELL',
+        'MOBILE', 'DATA', 'HOME', 'AUTO', 'LIFE', 'HEALTH', 'DENTAL', 'VISION', 'ATT',
+        'AT&T', 'ATT*BILL'
+    ],
+    'TRAVEL': [
+        'AIRLINE', 'HOTEL', 'MOTEL', 'VACATION', 'RENTAL', 'TRAVEL', 'FLIGHT', 'AIRBNB',
+        'VRBO', 'BOOKING', 'EXPEDIA', 'TRIP', 'CRUISE', 'RESORT', 'LODGE', 'INN',
+        'AIRPORT', 'TSA', 'BAGGAGE', 'TAXI', 'SHUTTLE', 'PARKING', 'CAR RENTAL'
+    ],
+    'ENTERTAINMENT': [
+        'NETFLIX', 'HULU', 'MOVIES', 'SHOW', 'THEATER', 'CINEMA', 'STREAMING',
+        'HBO', 'DISNEY+', 'PARAMOUNT', 'SHOWTIME', 'ENTERTAINMENT', 'FILM', 'TV'
+    ]
+}
+
+_DIGIT_RUN_REGEX = re.compile(r'\d+')
+
+
+class KeywordMatcher:
+    """
+    Compiled matcher that finds the first category whose keywords occur in a
+    description, in a single pass over the text.
+    
+    The keywords are compiled into an Aho-Corasick automaton: a trie whose
+    states also fall back to the state of their longest proper suffix, so one
+    walk over the description finds every keyword ending at each position.
+    Each state records the lowest category index among the keywords ending
+    there, which reproduces the dict-order, first-category-wins result of
+    scanning the categories one by one.
+    
+    The automaton is kept as a dense transition table in one flat array: each
+    state is a row of `width` entries, column 0 holding the state's category
+    index and column N the row offset reached on the Nth character of the
+    keyword alphabet. Characters outside the alphabet lead back to the root.
+    save() writes the array as is, so load() neither rebuilds nor compiles.
+    """
+    
+    # Version of the compiled layout; bump it whenever the attributes change so
+    # that matchers saved by save() are rebuilt
+    FORMAT_VERSION = '3'
+    
+    def __init__(self, category_keywords):
+        """
+        Build the matcher for a keyword set.
+        
+        Args:
+            category_keywords: Dictionary mapping category names to keyword lists
+        """
+        self.categories = list(category_keywords)
+        self._always = None  # Category index of an empty keyword, which matches anything
+        
+        # Lowest category index for each distinct keyword
+        keyword_index = {}
+        for index, keywords in enumerate(category_keywords.values()):
+            for keyword in keywords:
+                if not keyword:
+                    if self._always is None:
+                        self._always = index
+                    continue
+                keyword_index.setdefault(keyword, index)
+        self.keyword_count = len(keyword_index)
+        
+        # Digit runs of the keywords; any other run of digits in a description
+        # cannot take part in a match, so cache_key() leaves it out
+        self.digit_runs = frozenset(run for keyword in keyword_index for run in _DIGIT_RUN_REGEX.findall(keyword))
+        
+        # Build the trie, one dict of child states per state; an output of
+        # len(categories) means no keyword ends at the state
+        no_match = len(self.categories)
+        children = [{}]
+        outputs = [no_match]
+        for keyword, index in keyword_index.items():
+            state = 0
+            for char in keyword:
+                child = children[state].get(char)
+                if child is None:
+                    child = children[state][char] = len(children)
+                    children.append({})
+                    outputs.append(no_match)
+                state = child
+            outputs[state] = index
+        
+        self._columns = {char: column for column, char in
+                         enumerate(sorted({char for keyword in keyword_index for char in keyword}), 1)}
+        self._width = width = len(self._columns) + 1
+        
+        # Fill the table breadth-first, so that the row of a state's suffix is
+        # complete when the state is reached: the state starts from a copy of
+        # that row, inheriting its fallback transitions and its output, and
+        # then adds its own children
+        table = array('i', bytes(4 * width * len(children)))
+        table[0] = no_match
+        queue = deque()
+        for char, child in children[0].items():
+            table[self._columns[char]] = child * width
+            queue.append((child, 0))
+        while queue:
+            state, suffix = queue.popleft()
+            row = state * width
+            table[row:row + width] = table[suffix:suffix + width]
+            table[row] = min(outputs[state], table[suffix])
+            for char, child in children[state].items():
+                column = self._columns[char]
+                queue.append((child, table[suffix + column]))
+                table[row + column] = child * width
+        self._table = table
+    
+    @classmethod
+    def fingerprint(cls, category_keywords):
+        """Return a digest identifying the matcher built for a keyword set."""
+        digest = hashlib.sha256(cls.FORMAT_VERSION.encode())
+        digest.update(json.dumps(list(category_keywords.items())).encode())
+        return digest.hexdigest()
+    
+    def save(self, path, fingerprint):
+        """
+        Write the compiled automaton so it can be loaded without rebuilding it.
+        
+        The file is a line of JSON describing the matcher followed by the
+        transition table as little-endian int32.
+        
+        Args:
+            path: File to write
+            fingerprint: fingerprint() of the keyword set the matcher was built from
+        """
+        header = {
+            'fingerprint': fingerprint,
+            'categories': self.categories,
+            'keyword_count': self.keyword_count,
+            'digit_runs': sorted(self.digit_runs),
+            'always': self._always,
+            'alphabet': ''.join(self._columns)
+        }
+        table = self._table
+        if sys.byteorder != 'little':
+            table = array('i', table)
+            table.byteswap()
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(json.dumps(header).encode() + b'\n')
+                table.tofile(f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write compiled rules {path}: {str(e)}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    
+    @classmethod
+    def load(cls, path, fingerprint):
+        """
+        Load a matcher written by save(), if it was built from the same keyword set.
+        
+        Returns:
+            KeywordMatcher, or None if the file is missing, unreadable or stale
+        """
+        try:
+            with open(path, 'rb') as f:
+                header = json.loads(f.readline())
+                if header.get('fingerprint') != fingerprint:
+                    return None
+                table = array('i')
+                table.frombytes(f.read())
+            if sys.byteorder != 'little':
+                table.byteswap()
+            matcher = cls.__new__(cls)
+            matcher.categories = header['categories']
+            matcher.keyword_count = header['keyword_count']
+            matcher.digit_runs = frozenset(header['digit_runs'])
+            matcher._always = header['always']
+            matcher._columns = {char: column for column, char in enumerate(header['alphabet'], 1)}
+            matcher._width = len(matcher._columns) + 1
+            if len(table) % matcher._width:
+                raise ValueError("truncated transition table")
+            matcher._table = table
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable compiled rules {path}: {str(e)}")
+            return None
+        return matcher
+    
+    def cache_key(self, description):
+        """
+        Reduce a description to a key that determines its category.
+        
+        The description is uppercased and each run of digits that contains no
+        digit run of a keyword, such as a store number or reference ID, is
+        replaced by a placeholder that no keyword contains. Every keyword match
+        lies outside the replaced runs, so match() finds the same category in
+        the key as in the full description, while descriptions differing only
+        in those numbers share a key.
+        
+        Args:
+            description: The transaction description
+            
+        Returns:
+            Uppercase key, which can also be passed to match()
+        """
+        text = description.upper()
+        runs = self.digit_runs
+        if not runs:
+            return _DIGIT_RUN_REGEX.sub('\0', text)
+        return _DIGIT_RUN_REGEX.sub(
+            lambda found: found.group() if any(run in found.group() for run in runs) else '\0', text)
+    
+    def match(self, text):
+        """
+        Find the first category with a keyword occurring in the text.
+        
+        Args:
+            text: The text to search, already uppercased by the caller
+            
+        Returns:
+            Category name, or None if no keyword matches
+        """
+        no_match = len(self.categories)
+        best = no_match if self._always is None else self._always
+        if best:
+            columns = self._columns
+            table = self._table
+            state = 0
+            for char in text:
+                column = columns.get(char)
+                if column is None:
+                    state = 0
+                    continue
+                state = table[state + column]
+                if table[state] < best:
+                    best = table[state]
+                    if not best:
+                        break
+        if best == no_match:
+            return None
+        return self.categories[best]
+
+
+# Compiled matchers shared by processors with identical keywords, by fingerprint
+_shared_matchers = OrderedDict()
+_SHARED_MATCHER_LIMIT = 8
+
+def _shared_matcher(fingerprint, build):
+    """
+    Return the shared matcher for a fingerprint, creating it on a miss.
+    
+    The least recently used matcher is evicted beyond _SHARED_MATCHER_LIMIT.
+    
+    Args:
+        fingerprint: KeywordMatcher.fingerprint() of the keyword set
+        build: Callable returning the matcher when none is shared yet
+        
+    Returns:
+        KeywordMatcher
+    """
+    # Popping and reinserting marks the entry as most recently used
+    matcher = _shared_matchers.pop(fingerprint, None)
+    if matcher is None:
+        matcher = build()
+    _shared_matchers[fingerprint] = matcher
+    while len(_shared_matchers) > _SHARED_MATCHER_LIMIT:
+        _shared_matchers.popitem(last=False)
+    return matcher
+
+def load_category_rules(path):
+    """
+    Load category keywords from a rules file.
+    
+    The file maps each category to its list of keywords, in priority order.
+    JSON, TOML (.toml) and YAML (.yaml or .yml, which needs PyYAML) are
+    supported. Keywords are uppercased, since descriptions are matched in
+    uppercase.
+    
+    Args:
+        path: Path to the rules file
+        
+    Returns:
+        Dictionary mapping category names to keyword lists
+        
+    Raises:
+        ValueError: If the file is not a mapping of categories to keyword lists
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.toml':
+        try:
+            import tomllib
+        except ImportError:  # Python < 3.11
+            import tomli as tomllib
+        with open(path, 'rb') as f:
+            data = tomllib.load(f)
+    elif extension in ('.yaml', '.yml'):
+        try:
+            import yaml
+        except ImportError:
+            raise ImportError("PyYAML is required for YAML rule files: pip install pyyaml")
+        with open(path, 'r') as f:
+            data = yaml.safe_load(f)
+    else:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    
+    if not isinstance(data, dict):
+        raise ValueError(f"Rules file {path} must map categories to keyword lists")
+    category_keywords = {}
+    for category, keywords in data.items():
+        if not isinstance(keywords, list) or not all(isinstance(keyword, str) for keyword in keywords):
+            raise ValueError(f"Category {category!r} in {path} must be a list of keyword strings")
+        category_keywords[str(category)] = [keyword.upper() for keyword in keywords]
+    return category_keywords
+
+def _freeze_keywords(category_keywords):
+    """Copy category keywords into a read-only mapping of keyword tuples."""
+    return MappingProxyType({category: tuple(keywords) for category, keywords in category_keywords.items()})
+
+def write_category_rules(category_keywords, path):
+    """Write category keywords to a JSON rules file that load_category_rules() reads."""
+    with open(path, 'w') as f:
+        json.dump({category: list(keywords) for category, keywords in category_keywords.items()}, f, indent=2)
+        f.write('\n')
+
+
+# Two-letter codes Chase prints after the city at the end of a card description
+US_STATE_CODES = frozenset([
+    'AL', 'AK', 'AZ', 'AR', 'CA', 'CO', 'CT', 'DE', 'DC', 'FL', 'GA', 'HI', 'ID', 'IL', 'IN', 'IA',
+    'KS', 'KY', 'LA', 'ME', 'MD', 'MA', 'MI', 'MN', 'MS', 'MO', 'MT', 'NE', 'NV', 'NH', 'NJ', 'NM',
+    'NY', 'NC', 'ND', 'OH', 'OK', 'OR', 'PA', 'RI', 'SC', 'SD', 'TN', 'TX', 'UT', 'VT', 'VA', 'WA',
+    'WV', 'WI', 'WY', 'PR'
+])
+
+_STORE_NUMBER_REGEX = re.compile(r'#\d')
+_DIGIT_REGEX = re.compile(r'\d')
+
+def normalize_merchant(description):
+    """
+    Reduce a transaction description to a merchant key.
+
+    Descriptions are uppercased with whitespace collapsed, then the parts
+    that vary between visits to the same merchant are dropped: a trailing
+    state code, everything from a store number ("#1234") onwards (the city
+    follows it), reference IDs after a '*' that contain digits, and any other
+    token containing a digit. "STARBUCKS #1234 SAN FRANCISCO CA" and
+    "STARBUCKS #0987 OAKLAND CA" both become "STARBUCKS".
+
+    Args:
+        description: The transaction description
+
+    Returns:
+        Merchant key; the uppercased description if nothing would be left
+    """
+    tokens = description.upper().split()
+    kept = tokens
+    if len(kept) > 1 and kept[-1] in US_STATE_CODES:
+        kept = kept[:-1]
+
+    for index, token in enumerate(kept):
+        if index and _STORE_NUMBER_REGEX.match(token):
+            kept = kept[:index]
+            break
+
+    key = []
+    for token in kept:
+        if not _DIGIT_REGEX.search(token):
+            key.append(token)
+            continue
+        prefix, star, reference = token.partition('*')
+        if star and not _DIGIT_REGEX.search(prefix):
+            key.append(prefix + star)
+    return ' '.join(key) or ' '.join(tokens)
+
+
+class CategoryCache:
+    """
+    Bounded LRU cache of categorization results, keyed on KeywordMatcher.cache_key().
+
+    The same few hundred merchants account for most transactions, so most
+    lookups are hits. The owner clears the cache whenever the category
+    keywords change; persisted entries carry the rules version they were
+    computed under and are only loaded back for the same version.
+    """
+
+    def __init__(self, max_entries=10000):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of keys kept
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Return the cached category for a key, or None on a miss."""
+        category = self._entries.get(key)
+        if category is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return category
+
+    def put(self, key, category):
+        """Store a category, evicting the least recently used key when full."""
+        self._entries[key] = category
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop all entries; hit and miss counts are kept."""
+        self._entries.clear()
+
+    def hit_rate(self):
+        """Return the fraction of lookups that were hits, or None before any lookup."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else None
+
+    def load(self, path, version):
+        """
+        Load entries saved by save() under the same rules version.
+
+        Returns:
+            Number of entries loaded
+        """
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable category cache {path}: {str(e)}")
+            return 0
+        if data.get('version') != version:
+            logger.info(f"Category cache {path} was built with other rules; starting empty")
+            return 0
+        for key, category in data.get('entries', [])[-self.max_entries:]:
+            self.put(key, category)
+        return len(self._entries)
+
+    def save(self, path, version):
+        """Write the entries, least recently used first, to a JSON file."""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump({'version': version, 'entries': list(self._entries.items())}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write category cache {path}: {str(e)}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+class LineClassifier:
+    """
+    Precompiled classifier for statement text lines.
+    
+    Decides whether a line is a section header, a transaction, a dated line
+    that fails to parse, or something to ignore, and pulls out the date,
+    description and signed amount of a transaction in one regex pass.
+    
+    The transaction formats share the leading date, so they are combined into
+    one expression with the formats as ordered alternatives after it. Only the
+    fixed-length date is factored out: a shared greedy whitespace run would let
+    a later format match before the prefix gave back any whitespace. A format that matches anywhere in a line also matches at the
+    leftmost position where any format matches, so the combined search picks the
+    same format, date and description as trying each format in turn.
+    """
+    
+    HEADER = 'header'
+    TRANSACTION = 'transaction'
+    REJECTED = 'rejected'  # Dated line that matches no transaction format
+    IGNORE = 'ignore'
+    
+    # Section header text, matched case-insensitively, and the section it starts
+    SECTION_HEADERS = [
+        ('PURCHASES', 'PURCHASES'),
+        ('PAYMENTS AND OTHER CREDITS', 'PAYMENTS_AND_CREDITS'),
+        ('FEES CHARGED', 'FEES'),
+        ('INTEREST CHARGED', 'INTEREST'),
+        ('ADJUSTMENTS', 'ADJUSTMENTS'),
+    ]
+    
+    # Transaction formats as (pattern, negate amount); each captures date, description, amount
+    TRANSACTION_PATTERNS = [
+        # Standard format: MM/DD DESCRIPTION $AMOUNT
+        ('(\\d{2}/\\d{2})\\s+(.*?)\\s+(\\$[\\d,]+\\.\\d{2})$', False),
+        # Format with trailing spaces: MM/DD DESCRIPTION $AMOUNT 
+        ('(\\d{2}/\\d{2})\\s+(.*?)\\s+(\\$[\\d,]+\\.\\d{2})\\s+', False),
+        # Format without $ sign: MM/DD DESCRIPTION AMOUNT
+        ('(\\d{2}/\\d{2})\\s+(.*?)\\s+(\\d{1,3}(?:,\\d{3})*\\.\\d{2})$', False),
+        # Format for negative amounts: MM/DD DESCRIPTION -AMOUNT
+        ('(\\d{2}/\\d{2})\\s+(.*?)\\s+-(\\d{1,3}(?:,\\d{3})*\\.\\d{2})$', True),
+        # Format for negative amounts with $ sign: MM/DD DESCRIPTION -$AMOUNT
+        ('(\\d{2}/\\d{2})\\s+(.*?)\\s+-\\$(\\d{1,3}(?:,\\d{3})*\\.\\d{2})$', True),
+    ]
+    
+    # Leading date shared by every transaction format
+    TRANSACTION_PREFIX = '(\\d{2}/\\d{2})'
+    
+    DATE_PATTERN = r'\d{2}/\d{2}'  # MM/DD format
+    
+    # Heading above the account activity tables, repeated on continuation pages
+    ACTIVITY_HEADER = 'ACCOUNT ACTIVITY'
+    
+    # Text printed right after the account activity tables; no transactions follow it
+    ACTIVITY_END_MARKERS = ['TOTALS YEAR-TO-DATE']
+    
+    def __init__(self):
+        """Compile the header, transaction and date regular expressions."""
+        self._header_regexes = [(re.compile(re.escape(header), re.IGNORECASE), section)
+                                for header, section in self.SECTION_HEADERS]
+        
+        # Factor the shared date prefix out of the transaction formats; the
+        # amount group closes last, so match.lastindex identifies the format
+        alternatives = []
+        self._negate_by_group = {}
+        group = 1
+        for pattern, negate in self.TRANSACTION_PATTERNS:
+            assert pattern.startswith(self.TRANSACTION_PREFIX)
+            alternatives.append(pattern[len(self.TRANSACTION_PREFIX):])
+            group += 2
+            self._negate_by_group[group] = negate
+        self._transaction_regex = re.compile(
+            self.TRANSACTION_PREFIX + '(?:' + '|'.join(alternatives) + ')')
+        self._date_regex = re.compile(self.DATE_PATTERN)
+    
+    def find_section_header(self, line):
+        """
+        Find the section started by a header line.
+        
+        Args:
+            line: The line of text from the PDF
+            
+        Returns:
+            Section name of the first header found, in SECTION_HEADERS order, or None
+        """
+        # For ASCII text, case-insensitive matching is exactly a substring test
+        # on the uppercased line, which avoids a regex scan per header
+        if line.isascii():
+            line_upper = line.upper()
+            for header, section in self.SECTION_HEADERS:
+                if header in line_upper:
+                    return section
+            return None
+        
+        for regex, section in self._header_regexes:
+            if regex.search(line):
+                return section
+        return None
+    
+    def find_activity_end(self, text):
+        """Return True if the text contains a marker for the end of the account activity."""
+        text_upper = text.upper()
+        return any(marker in text_upper for marker in self.ACTIVITY_END_MARKERS)
+    
+    def parse_transaction(self, line):
+        """
+        Parse a transaction line without checking for section headers.
+        
+        Args:
+            line: The line of text from the PDF
+            
+        Returns:
+            Tuple of (date, description, amount in cents) or None if no format matches
+        """
+        match = self._transaction_regex.search(line)
+        if match is None:
+            return None
+        index = match.lastindex
+
+        # Every format ends the amount in exactly two decimals, so dropping the
+        # symbols and the decimal point leaves the amount in cents
+        amount = int(match.group(index).replace('$', '').replace(',', '').replace('.', ''))
+        if self._negate_by_group[index]:
+            amount = -amount
+        return match.group(1), match.group(index - 1).strip(), amount
+    
+    def classify(self, line):
+        """
+        Classify a line of statement text.
+        
+        Args:
+            line: The line of text from the PDF
+            
+        Returns:
+            Tuple of (kind, value): (HEADER, section name), (TRANSACTION,
+            (date, description, amount in cents)), (REJECTED, None) or (IGNORE, None)
+        """
+        section = self.find_section_header(line)
+        if section is not None:
+            return self.HEADER, section
+        
+        parsed = self.parse_transaction(line)
+        if parsed is not None:
+            return self.TRANSACTION, parsed
+        
+        if self._date_regex.search(line):
+            return self.REJECTED, None
+        return self.IGNORE, None
+
+
+def parse_cents(amount_str):
+    """
+    Convert an amount string such as "$1,234.50" or "-12.3" to integer cents.
+
+    The string is parsed as a decimal, so amounts never pass through float.
+
+    Raises:
+        ValueError: If the string is not a finite amount
+    """
+    from decimal import Decimal, InvalidOperation
+    
+    try:
+        amount = Decimal(amount_str.strip().replace('$', '').replace(',', ''))
+    except InvalidOperation:
+        raise ValueError(f"Invalid amount: {amount_str!r}")
+    if not amount.is_finite():
+        raise ValueError(f"Invalid amount: {amount_str!r}")
+    return int((amount * 100).to_integral_value())
+
+
+class Transaction:
+    """
+    Compact record of one transaction.
+
+    Amounts are held as integer cents. Types and categories are interned as
+    small integer codes into a label table shared by all records in the
+    process, so millions of rows do not each carry their own strings. Records
+    still support read access by the keys of the old transaction dictionaries
+    (transaction['amount'], ...), with 'amount' in dollars.
+    """
+
+    __slots__ = ('date', 'description', 'amount_cents', 'type_code', 'category_code')
+
+    # Label table shared by all records; codes are only meaningful within one process
+    _labels = []
+    _label_codes = {}
+
+    FIELDS = ('date', 'description', 'amount', 'type', 'category')
+
+    def __init__(self, date, description, amount_cents, type, category):
+        self.date = date
+        self.description = description
+        self.amount_cents = amount_cents
+        self.type_code = self.label_code(type)
+        self.category_code = self.label_code(category)
+
+    @classmethod
+    def label_code(cls, label):
+        """Return the interned code of a type or category label, assigning one if new."""
+        code = cls._label_codes.get(label)
+        if code is None:
+            code = cls._label_codes[label] = len(cls._labels)
+            cls._labels.append(label)
+        return code
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a record from a transaction dictionary with the amount in dollars."""
+        return cls(data['date'], data['description'], parse_cents(str(data['amount'])),
+                   data['type'], data['category'])
+
+    @property
+    def type(self):
+        return self._labels[self.type_code]
+
+    @type.setter
+    def type(self, value):
+        self.type_code = self.label_code(value)
+
+    @property
+    def category(self):
+        return self._labels[self.category_code]
+
+    @category.setter
+    def category(self, value):
+        self.category_code = self.label_code(value)
+
+    @property
+    def amount(self):
+        """Amount in dollars, for compatibility with the dictionary format."""
+        return self.amount_cents / 100
+
+    def __getitem__(self, key):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __eq__(self, other):
+        if not isinstance(other, Transaction):
+            return NotImplemented
+        return self.as_tuple() == other.as_tuple()
+
+    __hash__ = None
+
+    def __repr__(self):
+        return (f"Transaction(date={self.date!r}, description={self.description!r}, "
+                f"amount_cents={self.amount_cents}, type={self.type!r}, category={self.category!r})")
+
+    def __reduce__(self):
+        # Pickle by label, since codes differ between processes
+        return Transaction, self.as_tuple()
+
+    def as_tuple(self):
+        """Return (date, description, amount_cents, type, category)."""
+        return self.date, self.description, self.amount_cents, self.type, self.category
+
+    def as_dict(self):
+        """Return the transaction dictionary format, with the amount in dollars."""
+        return {
+            'date': self.date,
+            'description': self.description,
+            'amount': self.amount,
+            'type': self.type,
+            'category': self.category
+        }
+
+    def csv_row(self):
+        """Return the row written by export_to_csv, in Chase's column order."""
+        cents = abs(self.amount_cents)
+        return [self.date, self.date, self.description, self.category, self.type,
+                f"${cents // 100}.{cents % 100:02d}"]
+
+
+class StatementCache:
+    """
+    Persistent on-disk cache of the transactions extracted from each PDF.
+    
+    Entries are keyed by the SHA-256 of the PDF contents combined with the
+    processor's rules version, so a statement is only re-parsed when the file,
+    the parser or the category keywords change. Each entry is a JSON file in
+    the cache directory; its modification time records the last use and drives
+    eviction.
+    """
+    
+    def __init__(self, cache_dir, max_entries=1000, max_age_days=365):
+        """
+        Initialize the cache.
+        
+        Args:
+            cache_dir: Directory holding the cache entries
+            max_entries: Maximum number of entries kept by evict(), or None for no limit
+            max_age_days: Entries unused for longer than this are evicted, or None to keep them
+        """
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_age_days = max_age_days
+        os.makedirs(cache_dir, exist_ok=True)
+    
+    @staticmethod
+    def file_hash(path):
+        """Return the SHA-256 hex digest of a file's contents."""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+    
+    def key_for(self, pdf_path, processor):
+        """Return the cache key for a PDF parsed with the given processor."""
+        digest = hashlib.sha256()
+        digest.update(self.file_hash(pdf_path).encode())
+        digest.update(processor.rules_version().encode())
+        return digest.hexdigest()
+    
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+    
+    def get(self, key):
+        """
+        Look up cached transactions.
+        
+        Args:
+            key: Cache key from key_for()
+            
+        Returns:
+            List of Transaction records, or None on a miss
+        """
+        path = self._entry_path(key)
+        try:
+            with open(path, 'r') as f:
+                entry = json.load(f)
+            transactions = [Transaction(*row) for row in entry['transactions']]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable cache entry {path}: {str(e)}")
+            return None
+        
+        # Refresh the modification time so eviction treats this entry as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return transactions
+    
+    def put(self, key, transactions, source=None):
+        """
+        Store transactions under a key.
+        
+        The entry is written to a temporary file and renamed into place, so
+        concurrent workers never observe a partially written entry.
+        
+        Args:
+            key: Cache key from key_for()
+            transactions: List of Transaction records
+            source: Optional PDF path, recorded for reference
+        """
+        path = self._entry_path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump({'source': source,
+                           'transactions': [transaction.as_tuple() for transaction in transactions]}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write cache entry {path}: {str(e)}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    
+    def evict(self):
+        """
+        Remove entries older than max_age_days, then the least recently used
+        entries beyond max_entries.
+        
+        Returns:
+            Number of entries removed
+        """
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                entries.append((os.path.getmtime(path), path))
+            except OSError:
+                continue
+        entries.sort(reverse=True)  # Most recently used first
+        
+        expired = []
+        if self.max_age_days is not None:
+            cutoff = time.time() - self.max_age_days * 86400
+            expired = [path for mtime, path in entries if mtime < cutoff]
+            entries = [(mtime, path) for mtime, path in entries if mtime >= cutoff]
+        if self.max_entries is not None:
+            expired.extend(path for mtime, path in entries[self.max_entries:])
+        
+        removed = 0
+        for path in expired:
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+        if removed:
+            logger.info(f"Evicted {removed} entries from statement cache")
+        return removed
+
+
+class _StageTimer:
+    """Context manager that charges the time spent inside it to one stage of a PipelineMetrics."""
+    
+    __slots__ = ('metrics', 'name', 'wall_start', 'cpu_start', 'child_wall', 'child_cpu')
+    
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+    
+    def __enter__(self):
+        self.child_wall = 0.0
+        self.child_cpu = 0.0
+        self.metrics._stack.append(self)
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, tb):
+        wall = time.perf_counter() - self.wall_start
+        cpu = time.process_time() - self.cpu_start
+        stack = self.metrics._stack
+        stack.pop()
+        if stack:
+            # Time in this stage is not also charged to the enclosing stage
+            stack[-1].child_wall += wall
+            stack[-1].child_cpu += cpu
+        self.metrics.add_time(self.name, wall - self.child_wall, cpu - self.child_cpu)
+        return False
+
+
+class PipelineMetrics:
+    """
+    Per-stage timings and counters for statement processing.
+    
+    Stage times are exclusive: time spent in a nested stage (for example
+    categorization inside line classification) is charged only to the inner
+    stage. Processors hold None instead of a PipelineMetrics when metrics are
+    disabled, so the hot paths only pay for an `is None` check.
+    """
+    
+    STAGES = ['open', 'extract', 'classify_lines', 'categorize', 'write_csv', 'validate']
+    COUNTERS = ['statements', 'pages', 'lines_scanned', 'lines_rejected', 'transactions', 'uncategorized']
+    
+    def __init__(self):
+        self._stack = []
+        self.reset()
+    
+    def reset(self):
+        """Clear all timings and counters."""
+        self.stages = {}
+        self.counters = {name: 0 for name in self.COUNTERS}
+    
+    def stage(self, name):
+        """Return a context manager timing the enclosed code as the named stage."""
+        return _StageTimer(self, name)
+    
+    def add_time(self, name, wall, cpu, calls=1):
+        """Add wall and CPU seconds to a stage."""
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = self.stages[name] = {'wall': 0.0, 'cpu': 0.0, 'calls': 0}
+        stage['wall'] += wall
+        stage['cpu'] += cpu
+        stage['calls'] += calls
+    
+    def count(self, name, amount=1):
+        """Increase a counter."""
+        self.counters[name] = self.counters.get(name, 0) + amount
+    
+    def as_dict(self):
+        """Return the metrics as a JSON-serializable dictionary."""
+        return {
+            'stages': {name: dict(stage) for name, stage in self.stages.items()},
+            'counters': dict(self.counters)
+        }
+    
+    def merge(self, data):
+        """Add the metrics from another as_dict() result, e.g. from a worker process."""
+        for name, stage in data['stages'].items():
+            self.add_time(name, stage['wall'], stage['cpu'], stage['calls'])
+        for name, amount in data['counters'].items():
+            self.count(name, amount)
+    
+    def summary_lines(self):
+        """Return human-readable summary lines for logging."""
+        lines = []
+        ordered = [name for name in self.STAGES if name in self.stages]
+        ordered += [name for name in self.stages if name not in self.STAGES]
+        for name in ordered:
+            stage = self.stages[name]
+            lines.append(f"{name}: {stage['wall'] * 1000:.1f} ms wall, {stage['cpu'] * 1000:.1f} ms CPU, "
+                         f"{stage['calls']} calls")
+        lines.append(', '.join(f"{name}={amount}" for name, amount in self.counters.items()))
+        return lines
+
+
+def _timed(metrics, name):
+    """Time a stage when metrics are enabled; a no-op context otherwise."""
+    if metrics is None:
+        return nullcontext()
+    return metrics.stage(name)
+
+
+def infer_statement_date(pdf_path):
+    """
+    Infer a statement's closing date from its filename.
+    
+    Chase names downloaded statements like 20240115-statements-1234-.pdf;
+    a YYYYMMDD or YYYY-MM-DD date anywhere in the name is accepted.
+    
+    Returns:
+        datetime.date, or None if the name holds no valid date
+    """
+    match = re.search(r'((?:19|20)\d{2})-?(\d{2})-?(\d{2})', os.path.basename(pdf_path))
+    if not match:
+        return None
+    try:
+        return date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+    except ValueError:
+        return None
+
+def resolve_transaction_date(month_day, statement_date):
+    """
+    Turn a statement's MM/DD transaction date into an ISO date.
+    
+    Transactions dated in a later month than the statement closing date
+    belong to the previous year, e.g. December charges on a January statement.
+    
+    Args:
+        month_day: Date as printed on the statement, MM/DD
+        statement_date: Closing date of the statement, or None
+        
+    Returns:
+        ISO date string, or None if the year is unknown or the date is invalid
+    """
+    if statement_date is None:
+        return None
+    try:
+        month, day = (int(part) for part in month_day.split('/'))
+        year = statement_date.year - 1 if month > statement_date.month else statement_date.year
+        return date(year, month, day).isoformat()
+    except ValueError:
+        return None
+
+def read_transactions_csv(csv_path):
+    """
+    Read transactions back from a CSV file written by export_to_csv.
+
+    The CSV holds absolute amounts, so the sign is restored from the type:
+    payments and returns are negative, everything else positive. The sign of
+    an adjustment is not recoverable and it is read as positive.
+
+    Args:
+        csv_path: Path to the CSV file
+
+    Returns:
+        List of Transaction records as produced by parse_pdf
+    """
+    transactions = []
+    with open(csv_path, 'r', newline='') as f:
+        for row in csv.DictReader(f):
+            amount = parse_cents(row['Amount'])
+            if row['Type'] in ('Payment', 'Return'):
+                amount = -abs(amount)
+            transactions.append(Transaction(row['Transaction Date'], row['Description'], amount,
+                                            row['Type'], row['Category']))
+    return transactions
+
+
+class LedgerMerger:
+    """
+    Merges several statements into one date-sorted ledger without duplicates.
+    
+    Consecutive statements overlap around their closing dates, so pending and
+    late-posted transactions can appear on both. Each statement is sorted on
+    its own and the sorted runs are combined with a k-way merge, so the
+    archive is never re-sorted as a whole. A transaction is dropped when
+    another statement already contributed one with the same date, amount,
+    type and description. Repeats within one statement, such as two identical
+    coffees on the same day, are genuine and kept; across statements the
+    ledger keeps as many copies as the statement listing the most. Duplicates
+    share a date and the merged stream is in date order, so only the keys of
+    the current date are remembered.
+    
+    Transactions whose year cannot be resolved are never treated as
+    duplicates: the same MM/DD in two undated statements may well be a year
+    apart, as with an annual subscription.
+    """
+    
+    # Date key prefix of transactions whose year is unknown
+    UNKNOWN_YEAR_PREFIX = '0000-'
+    
+    def __init__(self):
+        self.merged = 0
+        self.duplicates = 0
+        self.undated = 0  # Transactions kept without a duplicate check
+    
+    @staticmethod
+    def _sorted_run(index, transactions, statement_date):
+        """
+        Resolve a statement's dates and sort its transactions by date.
+        
+        Returns:
+            List of (date key, statement index, position, transaction) tuples;
+            dates whose year is unknown keep their MM/DD form and sort first
+        """
+        run = []
+        for position, transaction in enumerate(transactions):
+            iso_date = resolve_transaction_date(transaction.date, statement_date)
+            if iso_date is not None:
+                transaction.date = iso_date
+                date_key = iso_date
+            else:
+                # The year is unknown; order by month and day ahead of the dated transactions
+                date_key = LedgerMerger.UNKNOWN_YEAR_PREFIX + transaction.date.replace('/', '-')
+            run.append((date_key, index, position, transaction))
+        run.sort(key=lambda entry: entry[0])
+        return run
+    
+    def merge(self, statements):
+        """
+        Merge statements into one stream.
+        
+        Args:
+            statements: Iterable of (transactions, statement closing date or None) pairs,
+                ideally in statement order, which breaks ties between equal dates
+            
+        Yields:
+            Transaction records in date order, with ISO dates where the year is known
+        """
+        runs = [self._sorted_run(index, transactions, statement_date)
+                for index, (transactions, statement_date) in enumerate(statements)]
+        
+        current_date = None
+        kept = {}         # Duplicate key -> copies already in the ledger
+        occurrences = {}  # (duplicate key, statement index) -> copies seen in that statement
+        for date_key, index, position, transaction in heapq.merge(*runs):
+            if date_key != current_date:
+                current_date = date_key
+                kept.clear()
+                occurrences.clear()
+            key = (transaction.amount_cents, transaction.type_code,
+                   ' '.join(transaction.description.upper().split()))
+            if date_key.startswith(self.UNKNOWN_YEAR_PREFIX):
+                # Only repeats within the statement are comparable, and those are kept
+                self.undated += 1
+                self.merged += 1
+                yield transaction
+                continue
+            seen = occurrences.get((key, index), 0) + 1
+            occurrences[(key, index)] = seen
+            if seen <= kept.get(key, 0):
+                self.duplicates += 1
+                continue
+            kept[key] = seen
+            self.merged += 1
+            yield transaction
+        
+        if self.undated:
+            logger.warning(f"{self.undated} transactions have no known year and were not checked for "
+                           "duplicates across statements; include the closing date in the statement file names")
+
+
+def _date_statement_csvs(csv_paths):
+    """Pair statement CSVs with the closing dates in their names, oldest first and undated ones leading."""
+    return sorted(((infer_statement_date(path), path) for path in csv_paths),
+                  key=lambda pair: (pair[0] or date.min, pair[1]))
+
+def write_merged_ledger(processor, csv_paths, output_path):
+    """
+    Merge statement CSVs written by export_to_csv into one deduplicated ledger CSV.
+    
+    Each statement's closing date is inferred from its file name, as for the
+    PDFs, to give the transactions their year and to order the statements.
+    
+    Args:
+        processor: ChaseStatementProcessor used to write the CSV
+        csv_paths: Paths of the per-statement CSV files
+        output_path: Path to write the ledger CSV
+        
+    Returns:
+        Dictionary with the number of transactions written and duplicates dropped
+    """
+    dated = _date_statement_csvs(csv_paths)
+    merger = LedgerMerger()
+    statements = ((read_transactions_csv(path), statement_date) for statement_date, path in dated)
+    count = processor.stream_to_csv(merger.merge(statements), output_path)
+    logger.info(f"Merged {len(dated)} statements into {output_path}: {count} transactions, "
+                f"{merger.duplicates} duplicates dropped")
+    return {'transactions': count, 'duplicates': merger.duplicates}
+
+
+class TransactionStore:
+    """
+    SQLite database of transactions from all processed statements.
+    
+    Each statement is identified by a statement ID (the SHA-256 of the PDF by
+    default) and stored idempotently: re-importing a statement replaces its
+    rows in a single database transaction. Transactions are indexed on date,
+    category, type and amount for fast queries across statements.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS statements (
+            statement_id TEXT PRIMARY KEY,
+            source_path TEXT,
+            statement_date TEXT,
+            transaction_count INTEGER NOT NULL,
+            imported_at TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS transactions (
+            id INTEGER PRIMARY KEY,
+            statement_id TEXT NOT NULL REFERENCES statements(statement_id) ON DELETE CASCADE,
+            seq INTEGER NOT NULL,
+            date TEXT,
+            raw_date TEXT NOT NULL,
+            description TEXT NOT NULL,
+            amount_cents INTEGER NOT NULL,
+            type TEXT NOT NULL,
+            category TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_transactions_statement ON transactions(statement_id);
+        CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions(date);
+        CREATE INDEX IF NOT EXISTS idx_transactions_category ON transactions(category, date);
+        CREATE INDEX IF NOT EXISTS idx_transactions_type ON transactions(type, date);
+        CREATE INDEX IF NOT EXISTS idx_transactions_amount ON transactions(amount_cents);
+    """
+    
+    def __init__(self, db_path, timeout=30.0):
+        """
+        Open or create the database.
+        
+        Args:
+            db_path: Path to the SQLite database file
+            timeout: Seconds to wait for another process's write lock
+        """
+        import sqlite3
+        
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path, timeout=timeout)
+        self.conn.execute('PRAGMA foreign_keys = ON')
+        self.conn.execute('PRAGMA journal_mode = WAL')
+        self.conn.executescript(self.SCHEMA)
+    
+    def close(self):
+        self.conn.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+        return False
+    
+    def upsert_statement(self, statement_id, transactions, source_path=None, statement_date=None,
+                         batch_size=1000):
+        """
+        Store a statement's transactions, replacing any previous import of it.
+        
+        Args:
+            statement_id: Unique ID of the statement
+            transactions: Iterable of Transaction records
+            source_path: Optional path of the statement PDF
+            statement_date: Optional closing date, used to give transactions full dates
+            batch_size: Rows per executemany() call
+            
+        Returns:
+            Number of transactions stored
+        """
+        insert = ('INSERT INTO transactions (statement_id, seq, date, raw_date, description, '
+                  'amount_cents, type, category) VALUES (?, ?, ?, ?, ?, ?, ?, ?)')
+        count = 0
+        with self.conn:  # One database transaction per statement
+            self.conn.execute('DELETE FROM statements WHERE statement_id = ?', (statement_id,))
+            self.conn.execute(
+                'INSERT INTO statements (statement_id, source_path, statement_date, transaction_count, imported_at) '
+                'VALUES (?, ?, ?, 0, ?)',
+                (statement_id, source_path, statement_date.isoformat() if statement_date else None,
+                 datetime.now().isoformat(timespec='seconds')))
+            
+            batch = []
+            for transaction in transactions:
+                batch.append((statement_id, count, resolve_transaction_date(transaction.date, statement_date),
+                              transaction.date, transaction.description,
+                              transaction.amount_cents, transaction.type, transaction.category))
+                count += 1
+                if len(batch) >= batch_size:
+                    self.conn.executemany(insert, batch)
+                    batch = []
+            if batch:
+                self.conn.executemany(insert, batch)
+            
+            self.conn.execute('UPDATE statements SET transaction_count = ? WHERE statement_id = ?',
+                              (count, statement_id))
+        logger.info(f"Stored {count} transactions for statement {statement_id[:12]} in {self.db_path}")
+        return count
+    
+    def _where(self, start=None, end=None, category=None, transaction_type=None):
+        """Build a WHERE clause and parameters for the common transaction filters."""
+        clauses = []
+        params = []
+        if start is not None:
+            clauses.append('date >= ?')
+            params.append(start)
+        if end is not None:
+            clauses.append('date <= ?')
+            params.append(end)
+        if category is not None:
+            clauses.append('category = ?')
+            params.append(category)
+        if transaction_type is not None:
+            clauses.append('type = ?')
+            params.append(transaction_type)
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+    
+    def transactions(self, start=None, end=None, category=None, transaction_type=None):
+        """
+        Query transactions across all statements.
+        
+        Args:
+            start: Optional first ISO date, inclusive
+            end: Optional last ISO date, inclusive
+            category: Optional category to match
+            transaction_type: Optional type to match ('Purchase', 'Payment', ...)
+            
+        Returns:
+            List of Transaction records in date order, with ISO dates where the year is known
+        """
+        where, params = self._where(start, end, category, transaction_type)
+        rows = self.conn.execute(
+            'SELECT date, raw_date, description, amount_cents, type, category FROM transactions'
+            + where + ' ORDER BY date, statement_id, seq', params)
+        return [Transaction(row[0] or row[1], row[2], row[3], row[4], row[5]) for row in rows]
+    
+    def category_totals(self, start=None, end=None, transaction_type='Purchase'):
+        """
+        Sum amounts per category.
+        
+        Returns:
+            Dictionary mapping category to total amount in dollars
+        """
+        where, params = self._where(start, end, transaction_type=transaction_type)
+        rows = self.conn.execute(
+            'SELECT category, SUM(amount_cents) FROM transactions' + where + ' GROUP BY category', params)
+        return {category: cents / 100 for category, cents in rows}
+    
+    def monthly_totals(self, start=None, end=None, transaction_type='Purchase'):
+        """
+        Sum amounts per calendar month, for transactions with a known year.
+        
+        Returns:
+            Dictionary mapping 'YYYY-MM' to total amount in dollars
+        """
+        where, params = self._where(start, end, transaction_type=transaction_type)
+        where += (' AND ' if where else ' WHERE ') + 'date IS NOT NULL'
+        rows = self.conn.execute(
+            'SELECT substr(date, 1, 7) AS month, SUM(amount_cents) FROM transactions' + where
+            + ' GROUP BY month ORDER BY month', params)
+        return {month: cents / 100 for month, cents in rows}
+
+
+class ColumnarFile:
+    """
+    Memory-mapped columnar file of transactions.
+    
+    A compact binary alternative to the CSVs for downstream readers: the file
+    is mapped read-only and each column is a typed view of the mapping, so
+    opening even a multi-year archive copies nothing and parses no text.
+    
+    Layout, little-endian throughout:
+        header: magic, format version, row count, footer offset and length
+        columns, each aligned to 8 bytes:
+            day            int32   days since 1970-01-01
+            amount_cents   int64   signed as in Transaction
+            category_code  uint16  index into the footer's categories
+            type_code      uint16  index into the footer's types
+            merchant_code  uint32  index into the footer's merchants (normalize_merchant keys)
+            desc_offsets   uint64  row count + 1 offsets into desc_heap
+            desc_heap      bytes   UTF-8 descriptions, back to back
+        footer: JSON with the label lists and each column's offset and length
+    
+    Dates whose year is unknown are stored in UNKNOWN_YEAR, a leap year so
+    that 02/29 survives; dates that are not valid at all are stored as NO_DAY
+    and their text is kept in the footer.
+    """
+    
+    MAGIC = b'CHASECOL'
+    FORMAT_VERSION = 1
+    HEADER = struct.Struct('<8sIIQQQ')
+    ALIGNMENT = 8
+    EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+    UNKNOWN_YEAR = 4
+    NO_DAY = -2 ** 31
+    
+    # Column name -> (array typecode, item size, numpy dtype)
+    COLUMNS = {
+        'day': ('i', 4, '<i4'),
+        'amount_cents': ('q', 8, '<i8'),
+        'category_code': ('H', 2, '<u2'),
+        'type_code': ('H', 2, '<u2'),
+        'merchant_code': ('I', 4, '<u4'),
+        'desc_offsets': ('Q', 8, '<u8'),
+        'desc_heap': ('B', 1, 'u1'),
+    }
+    
+    def __init__(self, path):
+        """
+        Map a columnar file for reading.
+        
+        Args:
+            path: Path to a file written by ColumnarFile.write()
+            
+        Raises:
+            ValueError: If the file is not a columnar transaction file of this version
+        """
+        import mmap
+        
+        self.path = path
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < self.HEADER.size:
+                raise ValueError(f"{path} is not a columnar transaction file")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, rows, footer_offset, footer_length = self.HEADER.unpack_from(self._mmap)
+        if magic != self.MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a columnar transaction file")
+        if version != self.FORMAT_VERSION:
+            self._mmap.close()
+            raise ValueError(f"{path} has columnar format version {version}, expected {self.FORMAT_VERSION}")
+        footer = json.loads(self._mmap[footer_offset:footer_offset + footer_length])
+        self.rows = rows
+        self.categories = footer['categories']
+        self.types = footer['types']
+        self.merchants = footer['merchants']
+        self.raw_dates = {int(row): text for row, text in footer['raw_dates'].items()}
+        self.extents = {name: tuple(extent) for name, extent in footer['columns'].items()}
+    
+    def close(self):
+        """Unmap the file; views returned by column() must have been released."""
+        self._mmap.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+        return False
+    
+    def __len__(self):
+        return self.rows
+    
+    def column(self, name):
+        """
+        Return a column without copying it.
+        
+        Returns:
+            memoryview of the mapped column, cast to its item type; on a
+            big-endian host, a byte-swapped array copy instead
+        """
+        offset, length = self.extents[name]
+        typecode = self.COLUMNS[name][0]
+        if sys.byteorder == 'little' or typecode == 'B':
+            return memoryview(self._mmap)[offset:offset + length].cast(typecode)
+        values = array(typecode, self._mmap[offset:offset + length])
+        values.byteswap()
+        return values
+    
+    def numpy_column(self, name):
+        """Return a column as a read-only NumPy array over the mapping; requires NumPy."""
+        import numpy as np
+        
+        offset, length = self.extents[name]
+        dtype = np.dtype(self.COLUMNS[name][2])
+        return np.frombuffer(self._mmap, dtype=dtype, count=length // dtype.itemsize, offset=offset)
+    
+    @classmethod
+    def day_number(cls, date_text, statement_date=None):
+        """
+        Encode a transaction date as days since 1970-01-01.
+        
+        Args:
+            date_text: ISO date, or MM/DD as printed on the statement
+            statement_date: Closing date giving MM/DD dates their year, or None
+            
+        Returns:
+            Day number; MM/DD dates without a year fall in UNKNOWN_YEAR, and
+            anything unparseable is NO_DAY
+        """
+        try:
+            if '/' in date_text:
+                iso_date = resolve_transaction_date(date_text, statement_date)
+                if iso_date is None:
+                    month, day = (int(part) for part in date_text.split('/'))
+                    return date(cls.UNKNOWN_YEAR, month, day).toordinal() - cls.EPOCH_ORDINAL
+                date_text = iso_date
+            return date.fromisoformat(date_text).toordinal() - cls.EPOCH_ORDINAL
+        except ValueError:
+            return cls.NO_DAY
+    
+    @classmethod
+    def format_day(cls, day):
+        """Decode a day number back to an ISO date, or MM/DD in UNKNOWN_YEAR; None for NO_DAY."""
+        if day == cls.NO_DAY:
+            return None
+        value = date.fromordinal(day + cls.EPOCH_ORDINAL)
+        if value.year == cls.UNKNOWN_YEAR:
+            return f"{value.month:02d}/{value.day:02d}"
+        return value.isoformat()
+    
+    def dates(self):
+        """Return every row's date as text: ISO, MM/DD when the year is unknown, or as printed."""
+        format_day = self.format_day
+        raw_dates = self.raw_dates
+        return [raw_dates[row] if day == self.NO_DAY else format_day(day)
+                for row, day in enumerate(self.column('day'))]
+    
+    def description(self, row):
+        """Return the description of one row."""
+        offsets = self.column('desc_offsets')
+        start, stop = self.extents['desc_heap'][0] + offsets[row], self.extents['desc_heap'][0] + offsets[row + 1]
+        return self._mmap[start:stop].decode('utf-8')
+    
+    def transactions(self):
+        """Rebuild the Transaction records, with ISO dates where the year is known."""
+        offsets = self.column('desc_offsets').tolist()
+        heap_start = self.extents['desc_heap'][0]
+        heap = self._mmap[heap_start:heap_start + offsets[-1]] if offsets else b''
+        categories, types = self.categories, self.types
+        return [Transaction(date_text, heap[offsets[row]:offsets[row + 1]].decode('utf-8'), cents,
+                            types[type_code], categories[category_code])
+                for row, (date_text, cents, category_code, type_code)
+                in enumerate(zip(self.dates(), self.column('amount_cents').tolist(),
+                                 self.column('category_code').tolist(), self.column('type_code').tolist()))]
+    
+    @classmethod
+    def write(cls, statements, path):
+        """
+        Write statements' transactions to a columnar file.
+        
+        The file is written under a temporary name and renamed into place.
+        
+        Args:
+            statements: Iterable of (transactions, statement closing date or None) pairs;
+                transaction dates may be MM/DD or ISO
+            path: Path of the columnar file
+            
+        Returns:
+            Number of transactions written
+        """
+        columns = {name: array(typecode) for name, (typecode, _, _) in cls.COLUMNS.items()}
+        labels = {'categories': {}, 'types': {}, 'merchants': {}}
+        raw_dates = {}
+        merchant_keys = {}
+        
+        def encode(kind, value):
+            codes = labels[kind]
+            code = codes.get(value)
+            if code is None:
+                code = codes[value] = len(codes)
+            return code
+        
+        heap = columns['desc_heap']
+        offsets = columns['desc_offsets']
+        offsets.append(0)
+        rows = 0
+        for transactions, statement_date in statements:
+            for transaction in transactions:
+                day = cls.day_number(transaction.date, statement_date)
+                if day == cls.NO_DAY:
+                    raw_dates[rows] = transaction.date
+                columns['day'].append(day)
+                columns['amount_cents'].append(transaction.amount_cents)
+                columns['category_code'].append(encode('categories', transaction.category))
+                columns['type_code'].append(encode('types', transaction.type))
+                merchant = merchant_keys.get(transaction.description)
+                if merchant is None:
+                    merchant = merchant_keys[transaction.description] = normalize_merchant(transaction.description)
+                columns['merchant_code'].append(encode('merchants', merchant))
+                heap.frombytes(transaction.description.encode('utf-8'))
+                offsets.append(len(heap))
+                rows += 1
+        if len(labels['categories']) > 0xFFFF or len(labels['types']) > 0xFFFF:
+            raise ValueError("Too many distinct categories or types for a columnar file")
+        
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(bytes(cls.HEADER.size))
+                extents = {}
+                for name, values in columns.items():
+                    f.write(bytes(-f.tell() % cls.ALIGNMENT))
+                    if sys.byteorder != 'little':
+                        values.byteswap()
+                    extents[name] = (f.tell(), len(values) * values.itemsize)
+                    values.tofile(f)
+                footer = json.dumps({
+                    'categories': list(labels['categories']),
+                    'types': list(labels['types']),
+                    'merchants': list(labels['merchants']),
+                    'raw_dates': raw_dates,
+                    'columns': extents
+                }).encode()
+                footer_offset = f.tell()
+                f.write(footer)
+                f.seek(0)
+                f.write(cls.HEADER.pack(cls.MAGIC, cls.FORMAT_VERSION, 0, rows, footer_offset, len(footer)))
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        logger.info(f"Wrote {rows} transactions to columnar file {path}")
+        return rows
+
+
+# Lowest normalized-description similarity at which reconciliation pairs two rows
+RECONCILE_MIN_SIMILARITY = 0.75
+
+_RECONCILE_DATE = re.compile(r'(?:(\d{4})-(\d{1,2})-(\d{1,2})|(\d{1,2})/(\d{1,2})(?:/(\d{2,4}))?)$')
+
+def _reconcile_date(date_text):
+    """
+    Parse an ISO, MM/DD/YYYY or MM/DD date from a CSV for reconciliation.
+    
+    Returns:
+        Tuple of (year or None, month, day), or None if the date is not understood
+    """
+    match = _RECONCILE_DATE.match(date_text.strip())
+    if not match:
+        return None
+    if match.group(1):
+        year, month, day = int(match.group(1)), int(match.group(2)), int(match.group(3))
+    else:
+        month, day = int(match.group(4)), int(match.group(5))
+        year = match.group(6) and int(match.group(6))
+        if year and year < 100:
+            year += 2000
+    try:
+        # Checked against a leap year when the year is unknown, so 02/29 is accepted
+        date(year or 2000, month, day)
+    except ValueError:
+        return None
+    return year or None, month, day
+
+def _reconcile_description(description):
+    """Uppercase a description and reduce it to words of letters and digits for similarity scoring."""
+    return ' '.join(re.sub(r'[^A-Z0-9]+', ' ', description.upper()).split())
+
+def _description_similarity(a, b):
+    """
+    Score how alike two normalized descriptions are, from 0 to 1.
+    
+    One description cut short inside the other, as truncated exports do,
+    scores 0.95; anything else is scored by difflib's ratio.
+    """
+    if a == b:
+        return 1.0
+    shorter, longer = (a, b) if len(a) <= len(b) else (b, a)
+    if len(shorter) >= 6 and longer.startswith(shorter):
+        return 0.95
+    import difflib
+    return difflib.SequenceMatcher(None, a, b, autojunk=False).ratio()
+
+def reconcile_transactions(chase_rows, our_rows, date_window=3, min_similarity=RECONCILE_MIN_SIMILARITY):
+    """
+    Pair up CSV rows that describe the same transaction despite small differences.
+    
+    Candidates are blocked on an index of absolute amounts in cents, so the
+    sign convention of either export does not matter, and narrowed to rows
+    dated within date_window days by bisecting each amount's date-sorted
+    list. Only those candidates are scored, on normalized-description
+    similarity less 0.02 per day apart, and the pairs are assigned one-to-one,
+    best confidence first. The cost grows with the number of rows and the
+    candidates per row, not with the product of the two files.
+    
+    When either side lacks years, dates are compared by day of the year,
+    wrapping around the new year.
+    
+    Args:
+        chase_rows: Rows of Chase's CSV, as dictionaries
+        our_rows: Rows of our CSV, as dictionaries
+        date_window: Largest difference in days between paired dates
+        min_similarity: Lowest description similarity for a pair
+        
+    Returns:
+        Tuple of (pairs, unmatched Chase rows, unmatched rows of ours); each pair
+        is a dictionary with the 'ours' and 'chase' rows, 'confidence' from 0 to 1,
+        'similarity' and 'day_offset'
+    """
+    def prepare(rows):
+        prepared = []
+        for row in rows:
+            try:
+                cents = abs(parse_cents(row.get('Amount', '') or ''))
+            except ValueError:
+                cents = None
+            prepared.append((cents, _reconcile_date(row.get('Transaction Date', '') or ''),
+                             _reconcile_description(row.get('Description', '') or '')))
+        return prepared
+    
+    chase = prepare(chase_rows)
+    ours = prepare(our_rows)
+    with_years = all(parsed is None or parsed[0] is not None for _, parsed, _ in chase + ours)
+    period = None if with_years else 366
+    
+    def day_number(parsed):
+        # Days since year 1, or the day of a leap year when comparing without years
+        if parsed is None:
+            return None
+        year, month, day = parsed
+        if with_years:
+            return date(year, month, day).toordinal()
+        return date(2000, month, day).timetuple().tm_yday
+    
+    chase = [(cents, day_number(parsed), description) for cents, parsed, description in chase]
+    ours = [(cents, day_number(parsed), description) for cents, parsed, description in ours]
+    
+    # Amount -> sorted (day number, Chase row index) of the Chase rows with that amount
+    index = {}
+    for j, (cents, day, _) in enumerate(chase):
+        if cents is not None and day is not None:
+            index.setdefault(cents, []).append((day, j))
+    for entries in index.values():
+        entries.sort()
+    
+    candidates = []
+    for i, (cents, day, description) in enumerate(ours):
+        entries = index.get(cents)
+        if not entries or day is None:
+            continue
+        windows = [day] if period is None else [day - period, day, day + period]
+        for center in windows:
+            start = bisect.bisect_left(entries, (center - date_window, -1))
+            stop = bisect.bisect_right(entries, (center + date_window, len(chase)))
+            for chase_day, j in entries[start:stop]:
+                similarity = _description_similarity(description, chase[j][2])
+                if similarity < min_similarity:
+                    continue
+                offset = chase_day - center
+                candidates.append((round(max(similarity - 0.02 * abs(offset), 0.0), 3), -abs(offset),
+                                   similarity, i, j, offset))
+    
+    # Greedy one-to-one assignment, most confident pairs first; ties go to
+    # the closer date and then to file order
+    candidates.sort(key=lambda c: (-c[0], -c[1], c[3], c[4]))
+    used_ours = set()
+    used_chase = set()
+    pairs = []
+    for confidence, _, similarity, i, j, offset in candidates:
+        if i in used_ours or j in used_chase:
+            continue
+        used_ours.add(i)
+        used_chase.add(j)
+        pairs.append({'ours': our_rows[i], 'chase': chase_rows[j], 'confidence': confidence,
+                      'similarity': round(similarity, 3), 'day_offset': offset})
+    
+    unmatched_chase = [row for j, row in enumerate(chase_rows) if j not in used_chase]
+    unmatched_ours = [row for i, row in enumerate(our_rows) if i not in used_ours]
+    return pairs, unmatched_chase, unmatched_ours
+
+
 class ChaseStatementProcessor:
-    def __init__(self, debug=False):
-        """Initialize the Chase statement processor."""
+    def __init__(self, debug=False, page_workers=1, low_memory=False, skip_inactive_pages=False,
+                 crop_to_activity=False, metrics=None, category_cache_size=10000, category_cache_path=None,
+                 rules_path=None, reconcile_days=None):
+        """
+        Initialize the Chase statement processor.
+        
+        Args:
+            debug: Enable debug logging
+            page_workers: Number of processes extracting page text within one statement
+            low_memory: Release each page's cached layout objects once its text is extracted
+            skip_inactive_pages: Skip pages before the first section header and stop
+                after the page that ends the account activity
+            crop_to_activity: Extract text only below the account activity heading and
+                skip pages without one
+            metrics: Optional PipelineMetrics to record stage timings and counters into
+            category_cache_size: Keys kept in the categorization cache, or 0 to disable it
+            category_cache_path: Optional JSON file to load the categorization cache from;
+                save_category_cache() writes it back
+            rules_path: Optional JSON, TOML or YAML file of category keywords to use instead
+                of DEFAULT_CATEGORY_KEYWORDS; it is reloaded when it changes
+            reconcile_days: Date window for fuzzy reconciliation in validate_against_chase_csv(),
+                or None to match rows exactly
+        """
         if debug:
             logger.setLevel(logging.DEBUG)
+        self.page_workers = page_workers
+        self.low_memory = low_memory
+        self.skip_inactive_pages = skip_inactive_pages
+        self.crop_to_activity = crop_to_activity
+        self.metrics = metrics
+        self.category_cache = CategoryCache(category_cache_size) if category_cache_size else None
+        self.category_cache_path = category_cache_path
+        self.reconcile_days = reconcile_days
         
-        # Define category keywords for transaction classification
-        self.category_keywords = {
-            'FOOD_DINING': [
-                'RESTAURANT', 'CAFE', 'COFFEE', 'DINER', 'BISTRO', 'GRILL', 'BURGER', 'PIZZA', 'SUSHI',
-                'TACO', 'THAI', 'CHINESE', 'ITALIAN', 'MEXICAN', 'JAPANESE', 'BBQ', 'STEAKHOUSE',
-                'DOORDASH', 'GRUBHUB', 'UBEREATS', 'SEAMLESS', 'POSTMATES', 'BAR', 'PUB', 'BREWERY',
-                'MCDONALD', 'WENDY', 'CHIPOTLE', 'PANERA', 'STARBUCKS', 'DUNKIN', 'PHO', 'BANH MI',
-                'BLUESTONE LANE'
-            ],
-            'GROCERIES': [
-                'WHOLE FOODS', 'WHOLEFDS', 'SAFEWAY', 'GROCERY', 'MARKET', 'SUPERMARKET', 'TRADER JOE', 'KROGER',
-                'ALBERTSONS', 'PUBLIX', 'ALDI', 'WEGMANS', 'COSTCO', 'FOOD LION', 'GIANT', 'MEIJER',
-                'VONS', 'SHOPRITE', 'SPROUTS', 'FRESH MARKET', 'ORGANIC', 'FARMERS MARKET', 'SEES CANDY',
-                'BI-RITE MARKET', 'RAINBOW GROCERY', 'DRAEGER\'S', 'TRADE COFFEE'
-            ],
-            'HOUSEHOLD_GOODS': [
-                'TARGET', 'AMAZON', 'WALGREENS', 'CVS', 'HOME DEPOT', 'LOWE\'S', 'BED BATH',
-                'IKEA', 'WAYFAIR', 'HARDWARE', 'CONTAINER STORE', 'CRATE BARREL', 'WILLIAM SONOMA',
-                'POTTERY BARN', 'BATH BODY WORKS', 'WALMART', 'COSTCO', 'BJ\'S', 'SAM\'S CLUB',
-                'UPS STORE', 'JACK\'S LAUNDRY', 'LAUNDRY'
-            ],
-            'WELLNESS': [
-                'MASSAGE', 'SPA', 'NAIL', 'SALON', 'BEAUTY', 'FACIAL', 'WAXING', 'MANICURE',
-                'PEDICURE', 'HAIR', 'BARBER', 'STYLIST', 'COSMETIC', 'ESTHETICIAN', 'SKIN CARE'
-            ],
-            'ACTIVITIES': [
-                'DOJO', 'GYM', 'FITNESS', 'SPORT', 'RECREATION', 'YOGA', 'PILATES', 'CROSSFIT',
-                'CYCLING', 'DANCE', 'CLIMBING', 'MARTIAL ARTS', 'POOL', 'TENNIS', 'GOLF',
-                'BOWLING', 'MUSEUM', 'THEATER', 'CINEMA', 'MOVIE', 'CONCERT', 'AQUARIUM', 'ZOO',
-                'SHIVWORKS', 'SAN FRANCISCO REC & PARKS'
-            ],
-            'SHOPPING': [
-                'CLOTHING', 'RETAIL', 'DEPARTMENT', 'STORE', 'BOUTIQUE', 'MACY', 'NORDSTROM', 
-                'SHOES', 'APPAREL', 'FASHION', 'OUTLET', 'MALL', 'FOOTWEAR', 'ACCESSORY', 'JEWELRY',
-                'WATCH', 'HANDBAG', 'NIKE', 'ADIDAS', 'GAP', 'ZARA', 'H&M', 'OLD NAVY', 'J CREW',
-                'LLBEAN', 'LULULEMON', 'SEPHORA', 'NEIMANMARCUS', 'ALO-YOGA',
-                'WILSON SPORTING', 'BODEN', 'VUORI', '20 SPOT'
-            ],
-            'TRANSPORT': [
-                'UBER', 'LYFT', 'TAXI', 'TRANSIT', 'SUBWAY', 'BUS', 'TRAIN', 'TRANSPORT',
-                'METRO', 'RAIL', 'COMMUTER', 'FERRY', 'TROLLEY', 'PARKING', 'GARAGE', 'TOLL',
-                'GAS', 'FUEL', 'CHARGING', 'CAR WASH', 'AUTO', 'VEHICLE', 'STATE FARM', 
-                'CLIPPER', 'SFMTA', 'PARKMOBILE', 'CALTRAIN'
-            ],
-            'SUBSCRIPTIONS': [
-                'SPOTIFY', 'SUBSCRIPTION', 'MONTHLY', 'DIGITAL', 'SERVICE',
-                'APPLE', 'GOOGLE', 'AMAZON PRIME', 'DISNEY+', 'HBO', 'AUDIBLE', 'XBOX', 'PLAYSTATION',
-                'NINTENDO', 'NEWSPAPER', 'MAGAZINE', 'JOURNAL', 'APP', 'SOFTWARE', 'CLOUD',
-                'CHATGPT', 'EXPRESSVPN', 'NYTIMES', 'BUSINESS INSIDER'
-            ],
-            'HEALTH': [
-                'MEDICAL', 'PHARMACY', 'CLINIC', 'DOCTOR', 'HOSPITAL', 'DENTIST', 'HEALTH',
-                'PHYSICIAN', 'OPTOMETRIST', 'OPTICAL', 'GLASSES', 'CONTACTS', 'THERAPY', 'COUNSELING',
-                'LABORATORY', 'TEST', 'IMAGING', 'SPECIALIST', 'EMERGENCY', 'AMBULANCE', 'PRESCRIPTION',
-                'ONEMED'
-            ],
-            'UTILITIES': [
-                'BILL', 'INSURANCE', 'PHONE', 'INTERNET', 'UTILITY', 'ELECTRIC', 'GAS', 'WATER',
-                'SEWER', 'TRASH', 'WIRELESS', 'CABLE', 'SATELLITE', 'TV', 'STREAMING', 'CELL',
-                'MOBILE', 'DATA', 'HOME', 'AUTO', 'LIFE', 'HEALTH', 'DENTAL', 'VISION', 'ATT',
-                'AT&T', 'ATT*BILL'
-            ],
-            'TRAVEL': [
-                'AIRLINE', 'HOTEL', 'MOTEL', 'VACATION', 'RENTAL', 'TRAVEL', 'FLIGHT', 'AIRBNB',
-                'VRBO', 'BOOKING', 'EXPEDIA', 'TRIP', 'CRUISE', 'RESORT', 'LODGE', 'INN',
-                'AIRPORT', 'TSA', 'BAGGAGE', 'TAXI', 'SHUTTLE', 'PARKING', 'CAR RENTAL'
-            ],
-            'ENTERTAINMENT': [
-                'NETFLIX', 'HULU', 'MOVIES', 'SHOW', 'THEATER', 'CINEMA', 'STREAMING',
-                'HBO', 'DISNEY+', 'PARAMOUNT', 'SHOWTIME', 'ENTERTAINMENT', 'FILM', 'TV'
-            ]
-        }
+        # Category keywords for transaction classification, from the rules file if given
+        self.rules_path = rules_path
+        self._rules_mtime = None
+        if rules_path:
+            self._load_rules()
+        else:
+            self.category_keywords = DEFAULT_CATEGORY_KEYWORDS
+
+        # Precompiled classifier shared by every line of every statement
+        self.line_classifier = LineClassifier()
+        
+        if self.category_cache is not None and category_cache_path:
+            loaded = self.category_cache.load(category_cache_path, self.rules_version())
+            logger.debug(f"Loaded {loaded} categorized merchants from {category_cache_path}")
+
+    @property
+    def category_keywords(self):
+        """
+        Read-only mapping of category names to keyword tuples, in priority order.
+        
+        The keywords cannot be edited in place, where the compiled matcher and
+        cached categories would not notice; assign a new mapping instead.
+        """
+        return self._category_keywords
+
+    @category_keywords.setter
+    def category_keywords(self, value):
+        # Assigning a new keyword set discards the compiled matcher and cached categories
+        self._category_keywords = _freeze_keywords(value)
+        self._keyword_matcher = None
+        if self.category_cache is not None:
+            self.category_cache.clear()
+
+    def rules_version(self):
+        """
+        Return a fingerprint of the parser version and category keywords.
+        
+        Cached extraction results are only reused when this matches.
+        """
+        digest = hashlib.sha256(PARSER_VERSION.encode())
+        digest.update(json.dumps(list(self._category_keywords.items())).encode())
+        return digest.hexdigest()
+
+    def refresh_keyword_matcher(self):
+        """
+        Recompile the keyword matcher and clear the categorization cache.
+        
+        Assigning category_keywords already recompiles on the next
+        categorization; this builds the matcher right away.
+        """
+        self._keyword_matcher = None
+        if self.category_cache is not None:
+            self.category_cache.clear()
+        return self._get_keyword_matcher()
+
+    def _get_keyword_matcher(self):
+        """
+        Return the compiled matcher for the current keyword set, building it if needed.
+        
+        Matchers are shared by all processors in the process with the same keywords.
+        """
+        matcher = self._keyword_matcher
+        if matcher is None:
+            fingerprint = KeywordMatcher.fingerprint(self._category_keywords)
+            matcher = _shared_matcher(fingerprint, self._compile_keywords)
+            self._keyword_matcher = matcher
+        return matcher
+
+    def _compile_keywords(self):
+        """Build a matcher for the current keyword set."""
+        matcher = KeywordMatcher(self._category_keywords)
+        logger.debug(f"Compiled keyword matcher with {matcher.keyword_count} keywords")
+        return matcher
+
+    def _load_rules(self):
+        """
+        Load category keywords from rules_path and install a matcher for them.
+        
+        The compiled matcher is saved next to the rules file and reused while
+        the rules are unchanged. The keywords, matcher and cache are swapped in
+        only once the new matcher is ready, so categorization running in other
+        threads carries on with the old matcher until then.
+        """
+        mtime = os.path.getmtime(self.rules_path)
+        category_keywords = load_category_rules(self.rules_path)
+        fingerprint = KeywordMatcher.fingerprint(category_keywords)
+        compiled_path = f"{self.rules_path}.matcher"
+        
+        def load_or_compile():
+            matcher = KeywordMatcher.load(compiled_path, fingerprint)
+            if matcher is None:
+                matcher = KeywordMatcher(category_keywords)
+                matcher.save(compiled_path, fingerprint)
+                logger.info(f"Compiled {matcher.keyword_count} keywords from {self.rules_path}")
+            return matcher
+        
+        matcher = _shared_matcher(fingerprint, load_or_compile)
+        
+        self._keyword_matcher = matcher
+        self._category_keywords = _freeze_keywords(category_keywords)
+        self._rules_mtime = mtime
+        if self.category_cache is not None:
+            self.category_cache.clear()
+
+    def reload_rules_if_changed(self):
+        """
+        Reload the rules file before a statement if it changed.
+        
+        The file, if any, is reloaded when its modification time changed since
+        it was loaded; a file that fails to load, e.g. while it is being edited,
+        is logged and the current rules stay in effect until the next check.
+        
+        Returns:
+            True if the rules were reloaded
+        """
+        if not self.rules_path:
+            return False
+        try:
+            if os.path.getmtime(self.rules_path) == self._rules_mtime:
+                return False
+            self._load_rules()
+        except (OSError, ValueError, ImportError) as e:
+            logger.warning(f"Could not reload rules from {self.rules_path}: {str(e)}")
+            return False
+        logger.info(f"Reloaded category rules from {self.rules_path}")
+        return True
+
+    def save_category_cache(self, path=None):
+        """Persist the categorization cache to path, or to category_cache_path if not given."""
+        path = path or self.category_cache_path
+        if self.category_cache is not None and path:
+            self.category_cache.save(path, self.rules_version())
 
     def parse_pdf(self, pdf_path):
         """
@@ -97,143 +1992,229 @@ class ChaseStatementProcessor:
             pdf_path: Path to the PDF file
             
         Returns:
-            List of transaction dictionaries
+            List of Transaction records
         """
-        transactions = []
-        current_section = None
-        date_pattern = r'\d{2}/\d{2}'  # MM/DD format
+        return list(self.iter_transactions(pdf_path))
+
+    def iter_transactions(self, pdf_path):
+        """
+        Parse a Chase statement PDF and yield its transactions page by page.
+        
+        Only one page's text and transactions are held at a time, so memory
+        stays flat regardless of statement length.
+        
+        Args:
+            pdf_path: Path to the PDF file
+            
+        Yields:
+            Transaction records, in statement order
+        """
+        # Pick up edits to the rules file between statements
+        self.reload_rules_if_changed()
         
         logger.info(f"Processing PDF: {pdf_path}")
+        yield from self.transactions_from_page_texts(self._iter_page_texts(pdf_path))
+
+    def transactions_from_page_texts(self, page_texts):
+        """
+        Run the section state machine over a statement's page texts.
+        
+        Args:
+            page_texts: Iterable of page texts in page order; a generator is closed
+                once the transactions are done, skipping any remaining pages
+            
+        Yields:
+            Transaction records, in statement order
+        """
+        current_section = None
+        count = 0
         try:
-            with pdfplumber.open(pdf_path) as pdf:
-                for page_num, page in enumerate(pdf.pages, 1):
-                    logger.info(f"Processing page {page_num} of {len(pdf.pages)}")
-                    text = page.extract_text()
-                    lines = text.split('\n')
-                    
-                    for line_num, line in enumerate(lines, 1):
-                        # Check for section headers
-                        if re.search(r'PURCHASES', line, re.IGNORECASE):
-                            current_section = 'PURCHASES'
-                            logger.debug(f"Entered section: {current_section}")
-                            continue
-                        elif re.search(r'PAYMENTS AND OTHER CREDITS', line, re.IGNORECASE):
-                            current_section = 'PAYMENTS_AND_CREDITS'
-                            logger.debug(f"Entered section: {current_section}")
-                            continue
-                        elif re.search(r'FEES CHARGED', line, re.IGNORECASE):
-                            current_section = 'FEES'
-                            logger.debug(f"Entered section: {current_section}")
-                            continue
-                        elif re.search(r'INTEREST CHARGED', line, re.IGNORECASE):
-                            current_section = 'INTEREST'
-                            logger.debug(f"Entered section: {current_section}")
-                            continue
-                        elif re.search(r'ADJUSTMENTS', line, re.IGNORECASE):
-                            current_section = 'ADJUSTMENTS'
-                            logger.debug(f"Entered section: {current_section}")
-                            continue
-                        
-                        # Skip lines that don't look like transactions
-                        if not re.search(date_pattern, line):
-                            continue
-                        
-                        # Process transaction based on section
-                        transaction = None
-                        if current_section == 'PURCHASES':
-                            transaction = self._parse_purchase(line)
-                            if transaction:
-                                # Force transaction type to be Purchase
-                                transaction['type'] = 'Purchase'
-                        elif current_section == 'PAYMENTS_AND_CREDITS':
-                            transaction = self._parse_payment_or_credit(line)
-                        elif current_section == 'FEES':
-                            transaction = self._parse_fee(line)
-                        elif current_section == 'INTEREST':
-                            transaction = self._parse_fee(line)
-                            if transaction:
-                                transaction['type'] = 'Interest'
-                        elif current_section == 'ADJUSTMENTS':
-                            transaction = self._parse_adjustment(line)
-                        
-                        if transaction:
-                            transactions.append(transaction)
-                            logger.debug(f"Found transaction: {transaction}")
+            for text in page_texts:
+                # Pages before the first section header cannot contain transactions
+                if (self.skip_inactive_pages and current_section is None and
+                        self.line_classifier.find_section_header(text) is None):
+                    logger.debug("Skipping page before the first section header")
+                    continue
+                
+                page_transactions, current_section = self._parse_lines(text.split('\n'), current_section)
+                count += len(page_transactions)
+                yield from page_transactions
+                
+                # Nothing after the end of the account activity is a transaction
+                if (self.skip_inactive_pages and current_section is not None and
+                        self.line_classifier.find_activity_end(text)):
+                    logger.debug("Reached end of account activity, skipping remaining pages")
+                    break
         except Exception as e:
             logger.error(f"Error processing PDF: {str(e)}")
             raise
+        finally:
+            if hasattr(page_texts, 'close'):
+                page_texts.close()
         
-        logger.info(f"Extracted {len(transactions)} transactions from PDF")
-        return transactions
+        logger.info(f"Extracted {count} transactions from PDF")
 
-    def _parse_transaction_line(self, line):
+    def _iter_page_texts(self, pdf_path):
         """
-        Parse a transaction line to extract date, description, and amount.
+        Yield the extracted text of each page, in page order.
         
-        Args:
-            line: The line of text from the PDF
-            
-        Returns:
-            Tuple of (date, description, amount) or None if parsing fails
+        With page_workers > 1 the pages are split into contiguous ranges that
+        are extracted in separate processes; the texts are still yielded in
+        order, so the section state machine sees the same sequence either way.
         """
-        # Try different patterns to handle variations in formatting
+        metrics = self.metrics
+        with _timed(metrics, 'open'):
+            # Only the first statement pays for the import
+            import pdfplumber
         
-        # Standard format: MM/DD DESCRIPTION $AMOUNT
-        pattern1 = '(\\d{2}/\\d{2})\\s+(.*?)\\s+(\\$[\\d,]+\\.\\d{2})$'
+        if self.page_workers > 1:
+            with _timed(metrics, 'open'):
+                with pdfplumber.open(pdf_path) as pdf:
+                    page_count = len(pdf.pages)
+            if page_count > 1:
+                yield from self._iter_page_texts_parallel(pdf_path, page_count)
+                return
         
-        # Format with trailing spaces: MM/DD DESCRIPTION $AMOUNT 
-        pattern2 = '(\\d{2}/\\d{2})\\s+(.*?)\\s+(\\$[\\d,]+\\.\\d{2})\\s+'
+        # Loading the page tree is part of opening the document
+        with _timed(metrics, 'open'):
+            pdf = pdfplumber.open(pdf_path)
+            pages = pdf.pages
+        with pdf:
+            for page_num, page in enumerate(pages, 1):
+                logger.info(f"Processing page {page_num} of {len(pages)}")
+                with _timed(metrics, 'extract'):
+                    text = _extract_page_text(page, self.crop_to_activity)
+                    if self.low_memory:
+                        # pdfplumber keeps every visited page's layout objects until the PDF closes
+                        page.close()
+                if metrics is not None:
+                    metrics.count('pages')
+                if text is not None:
+                    yield text
+
+    def _iter_page_texts_parallel(self, pdf_path, page_count):
+        """Extract page texts across worker processes and yield them in page order."""
+        workers = min(self.page_workers, page_count)
+        # Several ranges per worker keep the pool busy when pages differ in cost
+        chunk_size = max(1, -(-page_count // (workers * 4)))
+        ranges = [(start, min(start + chunk_size, page_count))
+                  for start in range(0, page_count, chunk_size)]
+        logger.info(f"Extracting {page_count} pages in {len(ranges)} ranges with {workers} worker processes")
         
-        # Format without $ sign: MM/DD DESCRIPTION AMOUNT
-        pattern3 = '(\\d{2}/\\d{2})\\s+(.*?)\\s+(\\d{1,3}(?:,\\d{3})*\\.\\d{2})$'
+        from concurrent.futures import ProcessPoolExecutor
         
-        # Format for negative amounts: MM/DD DESCRIPTION -AMOUNT
-        pattern4 = '(\\d{2}/\\d{2})\\s+(.*?)\\s+-(\\d{1,3}(?:,\\d{3})*\\.\\d{2})$'
+        metrics = self.metrics
+        executor = ProcessPoolExecutor(max_workers=workers)
+        try:
+            results = executor.map(_extract_page_range, [pdf_path] * len(ranges),
+                                   [start for start, stop in ranges],
+                                   [stop for start, stop in ranges],
+                                   [self.crop_to_activity] * len(ranges))
+            for start, stop in ranges:
+                # Wall time waiting for each range is charged to extraction
+                with _timed(metrics, 'extract'):
+                    texts = next(results)
+                if metrics is not None:
+                    metrics.count('pages', stop - start)
+                for text in texts:
+                    yield text
+        finally:
+            # Drop ranges not yet started if the caller stopped early
+            executor.shutdown(cancel_futures=True)
+
+    def _parse_lines(self, lines, current_section):
+        """
+        Run the section state machine over lines of statement text.
         
-        # Format for negative amounts with $ sign: MM/DD DESCRIPTION -$AMOUNT
-        pattern5 = '(\\d{2}/\\d{2})\\s+(.*?)\\s+-\\$(\\d{1,3}(?:,\\d{3})*\\.\\d{2})$'
+        Args:
+            lines: Lines of text, in statement order
+            current_section: Section in effect before the first line, or None
+            
+        Returns:
+            Tuple of (list of Transaction records, section in effect after the last line)
+        """
+        metrics = self.metrics
+        if metrics is not None:
+            metrics.count('lines_scanned', len(lines))
+            with metrics.stage('classify_lines'):
+                return self._parse_lines_unmetered(lines, current_section)
+        return self._parse_lines_unmetered(lines, current_section)
+
+    def _parse_lines_unmetered(self, lines, current_section):
+        """Section state machine behind _parse_lines(), without stage timing."""
+        transactions = []
+        classify = self.line_classifier.classify
         
-        patterns = [pattern1, pattern2, pattern3, pattern4, pattern5]
+        for line in lines:
+            # Classify the line in a single regex pass
+            kind, value = classify(line)
+            
+            # Check for section headers
+            if kind == LineClassifier.HEADER:
+                current_section = value
+                logger.debug(f"Entered section: {current_section}")
+                continue
+            
+            # Skip lines that don't look like transactions
+            if kind == LineClassifier.IGNORE or current_section is None:
+                continue
+            if kind == LineClassifier.REJECTED:
+                logger.warning(f"Failed to parse transaction line: {line}")
+                if self.metrics is not None:
+                    self.metrics.count('lines_rejected')
+                continue
+            
+            # Process transaction based on section
+            transaction = None
+            if current_section == 'PURCHASES':
+                transaction = self._parse_purchase(line, value)
+            elif current_section == 'PAYMENTS_AND_CREDITS':
+                transaction = self._parse_payment_or_credit(line, value)
+            elif current_section == 'FEES':
+                transaction = self._parse_fee(line, value)
+            elif current_section == 'INTEREST':
+                transaction = self._parse_fee(line, value)
+                if transaction:
+                    transaction.type = 'Interest'
+            elif current_section == 'ADJUSTMENTS':
+                transaction = self._parse_adjustment(line, value)
+            
+            if transaction:
+                transactions.append(transaction)
+                logger.debug(f"Found transaction: {transaction}")
         
-        for pattern in patterns:
-            match = re.search(pattern, line)
-            if match:
-                date, description, amount_str = match.groups()
-                
-                # Clean up the amount string and convert to float
-                amount_str = amount_str.replace('$', '').replace(',', '')
-                try:
-                    amount = float(amount_str)
-                    
-                    # For patterns 4 and 5 (negative amounts), negate the amount
-                    if pattern in [pattern4, pattern5]:
-                        amount = -amount
-                        
-                    return date, description.strip(), amount
-                except ValueError:
-                    logger.warning(f"Failed to convert amount to float: {amount_str}")
-                    continue
+        return transactions, current_section
+
+    def _parse_transaction_line(self, line):
+        """
+        Parse a transaction line to extract date, description, and amount.
         
-        logger.warning(f"Failed to parse transaction line: {line}")
-        return None
+        Args:
+            line: The line of text from the PDF
+            
+        Returns:
+            Tuple of (date, description, amount in cents) or None if parsing fails
+        """
+        parsed = self.line_classifier.parse_transaction(line)
+        if parsed is None:
+            logger.warning(f"Failed to parse transaction line: {line}")
+            if self.metrics is not None:
+                self.metrics.count('lines_rejected')
+        return parsed
 
-    def _parse_purchase(self, line):
-        """Parse a line from the Purchases section."""
-        parsed = self._parse_transaction_line(line)
+    def _parse_purchase(self, line, parsed=None):
+        """Parse a line from the Purchases section, optionally reusing an already parsed tuple."""
+        if parsed is None:
+            parsed = self._parse_transaction_line(line)
         if parsed:
             date, description, amount = parsed
-            return {
-                'date': date,
-                'description': description,
-                'amount': amount,
-                'type': 'Purchase',
-                'category': self.categorize_transaction(description)
-            }
+            return Transaction(date, description, amount, 'Purchase', self.categorize_transaction(description))
         return None
 
-    def _parse_payment_or_credit(self, line):
-        """Parse a line from the Payments and Credits section."""
-        parsed = self._parse_transaction_line(line)
+    def _parse_payment_or_credit(self, line, parsed=None):
+        """Parse a line from the Payments and Credits section, optionally reusing an already parsed tuple."""
+        if parsed is None:
+            parsed = self._parse_transaction_line(line)
         if parsed:
             date, description, amount = parsed
             
@@ -259,108 +2240,279 @@ class ChaseStatementProcessor:
             
             logger.debug(f"Payment/Credit: '{description}', identified as: {transaction_type}")
             
-            return {
-                'date': date,
-                'description': description,
-                'amount': amount,
-                'type': transaction_type,
-                'category': category
-            }
+            return Transaction(date, description, amount, transaction_type, category)
         return None
 
-    def _parse_fee(self, line):
-        """Parse a line from the Fees section."""
-        parsed = self._parse_transaction_line(line)
+    def _parse_fee(self, line, parsed=None):
+        """Parse a line from the Fees section, optionally reusing an already parsed tuple."""
+        if parsed is None:
+            parsed = self._parse_transaction_line(line)
         if parsed:
             date, description, amount = parsed
-            return {
-                'date': date,
-                'description': description,
-                'amount': amount,
-                'type': 'Fee',
-                'category': 'Fee'
-            }
+            return Transaction(date, description, amount, 'Fee', 'Fee')
         return None
 
-    def _parse_adjustment(self, line):
-        """Parse a line from the Adjustments section."""
-        parsed = self._parse_transaction_line(line)
+    def _parse_adjustment(self, line, parsed=None):
+        """Parse a line from the Adjustments section, optionally reusing an already parsed tuple."""
+        if parsed is None:
+            parsed = self._parse_transaction_line(line)
         if parsed:
             date, description, amount = parsed
-            return {
-                'date': date,
-                'description': description,
-                'amount': amount,
-                'type': 'Adjustment',
-                'category': 'Adjustment'
-            }
+            return Transaction(date, description, amount, 'Adjustment', 'Adjustment')
         return None
 
     def categorize_transaction(self, description):
         """
-        Categorize a transaction based on its description.
+        Categorize a transaction based on its description.
+        
+        Args:
+            description: The transaction description
+            
+        Returns:
+            Category string
+        """
+        metrics = self.metrics
+        if metrics is not None:
+            with metrics.stage('categorize'):
+                category = self._categorize_description(description)
+            if category == 'UNCATEGORIZED':
+                metrics.count('uncategorized')
+            return category
+        return self._categorize_description(description)
+
+    def _categorize_description(self, description):
+        """Keyword lookup behind categorize_transaction(), without metrics."""
+        matcher = self._get_keyword_matcher()
+        
+        # Key the cache on the description without the store numbers and
+        # reference IDs no keyword can match; the key is already uppercase
+        # for case-insensitive matching and yields the same category
+        key = matcher.cache_key(description)
+        cache = self.category_cache
+        if cache is not None:
+            category = cache.get(key)
+            if category is not None:
+                return category
+        
+        # Find the first category with a matching keyword in one pass,
+        # defaulting to UNCATEGORIZED if no keyword matches
+        category = matcher.match(key) or 'UNCATEGORIZED'
+        if cache is not None and self._keyword_matcher is matcher:
+            # Not cached if the rules were reloaded while this call ran
+            cache.put(key, category)
+        return category
+
+    def export_to_csv(self, transactions, output_path):
+        """
+        Write transactions to a CSV file in Chase's format.
+        
+        Args:
+            transactions: List or other iterable of Transaction records
+            output_path: Path to write the CSV file
+        """
+        try:
+            self.stream_to_csv(transactions, output_path)
+            return True
+        except Exception as e:
+            logger.error(f"Error writing to CSV: {str(e)}")
+            return False
+
+    def export_to_columnar(self, transactions, output_path, statement_date=None):
+        """
+        Write transactions to a memory-mapped columnar file; see ColumnarFile.
         
         Args:
-            description: The transaction description
-            
-        Returns:
-            Category string
+            transactions: List or other iterable of Transaction records
+            output_path: Path to write the columnar file
+            statement_date: Optional closing date giving MM/DD dates their year
         """
-        # Convert to uppercase for case-insensitive matching
-        desc_upper = description.upper()
-        
-        # Check each category for matching keywords
-        for category, keywords in self.category_keywords.items():
-            if any(keyword in desc_upper for keyword in keywords):
-                return category
-        
-        # Default category if no match is found
-        return 'UNCATEGORIZED'
+        try:
+            ColumnarFile.write([(transactions, statement_date)], output_path)
+            return True
+        except Exception as e:
+            logger.error(f"Error writing columnar file: {str(e)}")
+            return False
 
-    def export_to_csv(self, transactions, output_path):
+    def stream_to_csv(self, transactions, output_path, metrics=None):
         """
-        Write transactions to a CSV file in Chase's format.
+        Write transactions to a CSV file in Chase's format as they arrive.
+        
+        Rows are written while the iterable is consumed, so a generator such as
+        iter_transactions() is never held in memory in full. The file is written
+        under a temporary name and renamed into place once complete; errors,
+        including those raised while producing transactions, are propagated.
         
         Args:
-            transactions: List of transaction dictionaries
+            transactions: Iterable of Transaction records
             output_path: Path to write the CSV file
+            metrics: Optional PipelineMetrics charged with the writes as write_csv
+            
+        Returns:
+            Number of transactions written
         """
         # Define the headers based on Chase's format
         headers = ['Transaction Date', 'Post Date', 'Description', 'Category', 'Type', 'Amount']
         
-        logger.info(f"Writing {len(transactions)} transactions to {output_path}")
+        logger.info(f"Writing transactions to {output_path}")
+        tmp_path = f"{output_path}.tmp"
+        count = 0
         try:
-            with open(output_path, 'w', newline='') as csvfile:
-                writer = csv.DictWriter(csvfile, fieldnames=headers)
-                writer.writeheader()
+            with open(tmp_path, 'w', newline='') as csvfile:
+                writer = csv.writer(csvfile)
+                writer.writerow(headers)
                 
+                # Only the writes are charged to write_csv: producing the
+                # transactions, e.g. parsing a PDF on the fly, has its own stages
                 for transaction in transactions:
-                    # Convert our transaction format to Chase's format
-                    writer.writerow({
-                        'Transaction Date': transaction['date'],
-                        'Post Date': transaction['date'],  # We might not have post date info
-                        'Description': transaction['description'],
-                        'Category': transaction['category'],
-                        'Type': transaction['type'],
-                        'Amount': f"${abs(transaction['amount']):.2f}"
-                    })
-            logger.info(f"Successfully wrote transactions to {output_path}")
+                    # Convert our transaction format to Chase's format; we might
+                    # not have post date info, so the transaction date is repeated
+                    if metrics is None:
+                        writer.writerow(transaction.csv_row())
+                    else:
+                        with metrics.stage('write_csv'):
+                            writer.writerow(transaction.csv_row())
+                    count += 1
+                with _timed(metrics, 'write_csv'):
+                    csvfile.flush()
+            os.replace(tmp_path, output_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        logger.info(f"Successfully wrote {count} transactions to {output_path}")
+        return count
+
+    def recategorize_csv(self, csv_path, output_path=None, chunk_size=10000, categories=None):
+        """
+        Re-run categorization over a CSV file written by export_to_csv.
+        
+        Purchases and returns get the category the current rules give their
+        description; other rows and all other columns are copied unchanged.
+        No PDF is opened. Rows are streamed in chunks of chunk_size, and each
+        distinct description is categorized once. The output is written under a
+        temporary name and renamed into place, so csv_path itself may be the
+        output; when it is and no category changed, the file is left untouched.
+        
+        Args:
+            csv_path: Path to the CSV file
+            output_path: Path to write the recategorized CSV; defaults to csv_path
+            chunk_size: Rows read and written at a time
+            categories: Optional dictionary of description -> category, shared across
+                calls so that descriptions repeated across files are categorized once;
+                it is cleared when the rules changed since the previous call
+            
+        Returns:
+            Tuple of (rows written, rows whose category changed)
+        """
+        in_place = output_path is None or os.path.abspath(output_path) == os.path.abspath(csv_path)
+        output_path = output_path or csv_path
+        if categories is None:
+            categories = {}
+        if self.reload_rules_if_changed():
+            categories.clear()
+        tmp_path = f"{output_path}.tmp"
+        rows = 0
+        changed = 0
+        try:
+            with open(csv_path, 'r', newline='') as infile, open(tmp_path, 'w', newline='') as outfile:
+                reader = csv.reader(infile)
+                writer = csv.writer(outfile)
+                header = next(reader, None)
+                if header is None:
+                    raise ValueError(f"{csv_path} is empty")
+                writer.writerow(header)
+                description_col = header.index('Description')
+                category_col = header.index('Category')
+                type_col = header.index('Type')
+                while True:
+                    chunk = list(islice(reader, chunk_size))
+                    if not chunk:
+                        break
+                    # Categorize the descriptions this chunk adds, once each
+                    recategorized = [row for row in chunk if row[type_col] in ('Purchase', 'Return')]
+                    for description in {row[description_col] for row in recategorized}.difference(categories):
+                        categories[description] = self.categorize_transaction(description)
+                    for row in recategorized:
+                        category = categories[row[description_col]]
+                        if category != row[category_col]:
+                            row[category_col] = category
+                            changed += 1
+                    writer.writerows(chunk)
+                    rows += len(chunk)
+            if in_place and not changed:
+                os.remove(tmp_path)
+            else:
+                os.replace(tmp_path, output_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        logger.info(f"Recategorized {csv_path}: {changed} of {rows} categories changed")
+        return rows, changed
+
+    def export_to_sqlite(self, transactions, db_path, statement_id, source_path=None, statement_date=None):
+        """
+        Store transactions in a SQLite TransactionStore, replacing any earlier import of the statement.
+        
+        Args:
+            transactions: Iterable of Transaction records
+            db_path: Path to the SQLite database file
+            statement_id: Unique ID of the statement
+            source_path: Optional path of the statement PDF
+            statement_date: Optional closing date, used to give transactions full dates
+        """
+        try:
+            with TransactionStore(db_path) as store:
+                store.upsert_statement(statement_id, transactions, source_path, statement_date)
             return True
         except Exception as e:
-            logger.error(f"Error writing to CSV: {str(e)}")
+            logger.error(f"Error writing to SQLite: {str(e)}")
             return False
 
-    def validate_against_chase_csv(self, our_csv_path, chase_csv_path):
+    @staticmethod
+    def _validation_key(row):
+        """
+        Build the normalized (date, description, amount) key used to match CSV rows.
+        
+        Surrounding whitespace is dropped, runs of whitespace in the description
+        are collapsed, and amounts are compared as decimals so that "$1,234.50"
+        and "1234.5" are the same amount.
+        """
+        date = row.get('Transaction Date', '') or ''
+        description = row.get('Description', '') or ''
+        amount_str = (row.get('Amount', '') or '').strip()
+        
+        from decimal import Decimal, InvalidOperation
+        try:
+            amount = Decimal(amount_str.replace('$', '').replace(',', ''))
+            if not amount.is_finite():
+                amount = amount_str
+        except InvalidOperation:
+            amount = amount_str
+        return date.strip(), ' '.join(description.split()), amount
+
+    def validate_against_chase_csv(self, our_csv_path, chase_csv_path, reconcile_days=None,
+                                   min_similarity=RECONCILE_MIN_SIMILARITY):
         """
         Compare our generated CSV with Chase's downloaded CSV.
         
+        Rows are first matched exactly on (date, description, amount). In
+        reconciliation mode the rows left over on both sides are then paired
+        by reconcile_transactions(), tolerating description truncation or
+        whitespace differences and dates up to reconcile_days apart.
+        
         Args:
             our_csv_path: Path to our generated CSV
             chase_csv_path: Path to Chase's downloaded CSV
+            reconcile_days: Date window in days for reconciliation; None uses the
+                processor's reconcile_days, which is None for exact matching only
+            min_similarity: Lowest description similarity accepted when reconciling
             
         Returns:
-            Dictionary with validation results
+            Dictionary with validation results; 'reconciled' lists the fuzzy pairs
         """
+        if reconcile_days is None:
+            reconcile_days = self.reconcile_days
         our_transactions = []
         chase_transactions = []
         
@@ -388,60 +2540,217 @@ class ChaseStatementProcessor:
             logger.error(f"Error reading Chase's CSV: {str(e)}")
             raise
         
-        # Compare the transactions
+        # Compare the transactions with a hash join on the normalized key fields.
+        # Counting keys as a multiset matches duplicate rows one-to-one, so two
+        # identical same-day charges need two matching rows on the other side.
         missing_in_ours = []
         missing_in_chase = []
         
+        our_counts = Counter(self._validation_key(tx) for tx in our_transactions)
         for chase_tx in chase_transactions:
-            found = False
-            for our_tx in our_transactions:
-                # Compare the key fields (some columns might have slightly different names)
-                chase_date = chase_tx.get('Transaction Date', '')
-                chase_desc = chase_tx.get('Description', '')
-                chase_amount = chase_tx.get('Amount', '')
-                
-                our_date = our_tx.get('Transaction Date', '')
-                our_desc = our_tx.get('Description', '')
-                our_amount = our_tx.get('Amount', '')
-                
-                if (our_date == chase_date and 
-                    our_desc == chase_desc and 
-                    our_amount == chase_amount):
-                    found = True
-                    break
-            if not found:
+            key = self._validation_key(chase_tx)
+            if our_counts[key] > 0:
+                our_counts[key] -= 1
+            else:
                 missing_in_ours.append(chase_tx)
         
+        chase_counts = Counter(self._validation_key(tx) for tx in chase_transactions)
         for our_tx in our_transactions:
-            found = False
-            for chase_tx in chase_transactions:
-                chase_date = chase_tx.get('Transaction Date', '')
-                chase_desc = chase_tx.get('Description', '')
-                chase_amount = chase_tx.get('Amount', '')
-                
-                our_date = our_tx.get('Transaction Date', '')
-                our_desc = our_tx.get('Description', '')
-                our_amount = our_tx.get('Amount', '')
-                
-                if (our_date == chase_date and 
-                    our_desc == chase_desc and 
-                    our_amount == chase_amount):
-                    found = True
-                    break
-            if not found:
+            key = self._validation_key(our_tx)
+            if chase_counts[key] > 0:
+                chase_counts[key] -= 1
+            else:
                 missing_in_chase.append(our_tx)
         
+        # Pair up what the exact join left over, if reconciling
+        reconciled = []
+        if reconcile_days is not None and (missing_in_ours or missing_in_chase):
+            # Chase rows missing in ours against our rows missing in Chase's
+            reconciled, missing_in_ours, missing_in_chase = reconcile_transactions(
+                missing_in_ours, missing_in_chase, reconcile_days, min_similarity)
+        
         results = {
             'missing_in_ours': missing_in_ours,
             'missing_in_chase': missing_in_chase,
+            'reconciled': reconciled,
             'is_valid': len(missing_in_ours) == 0 and len(missing_in_chase) == 0
         }
         
-        logger.info(f"Validation results: {len(missing_in_ours)} missing in ours, {len(missing_in_chase)} missing in Chase's")
+        logger.info(f"Validation results: {len(missing_in_ours)} missing in ours, {len(missing_in_chase)} missing in Chase's"
+                    + (f", {len(reconciled)} reconciled" if reconcile_days is not None else ''))
         return results
 
 
-def process_statement(processor, pdf_path, output_path, validate_path=None):
+def _has_activity_header(page):
+    """
+    Check whether a page contains the account activity heading.
+    
+    Only pdfminer's layout objects are inspected, so pages without the
+    heading are rejected before pdfplumber converts every object on them.
+    """
+    from pdfminer.layout import LTChar, LTContainer
+    
+    target = LineClassifier.ACTIVITY_HEADER.replace(' ', '')
+    text_chars = []
+    stack = [page.layout]
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, LTChar):
+            text_chars.append(obj.get_text())
+        elif isinstance(obj, LTContainer):
+            stack.extend(reversed(list(obj)))
+    return target in ''.join(''.join(text_chars).split()).upper()
+
+def _find_activity_top(page):
+    """
+    Find the top coordinate of the account activity heading on a page.
+    
+    The heading is located in the page's characters, ignoring whitespace,
+    which avoids running layout analysis on the whole page.
+    
+    Returns:
+        Top coordinate of the heading, or None if the page has none
+    """
+    target = LineClassifier.ACTIVITY_HEADER.replace(' ', '')
+    text_chars = []
+    char_objects = []
+    for char in page.chars:
+        for text_char in char['text']:
+            if not text_char.isspace():
+                text_chars.append(text_char)
+                char_objects.append(char)
+    
+    index = ''.join(text_chars).upper().find(target)
+    if index < 0:
+        return None
+    return min(char['top'] for char in char_objects[index:index + len(target)])
+
+def _extract_page_text(page, crop_to_activity=False):
+    """
+    Extract the text of a page, optionally only below the account activity heading.
+    
+    Args:
+        page: pdfplumber page
+        crop_to_activity: Crop to the region from the activity heading to the bottom of the page
+        
+    Returns:
+        Page text, or None when cropping and the page has no activity heading
+    """
+    if not crop_to_activity:
+        return page.extract_text()
+    
+    if not _has_activity_header(page):
+        logger.debug(f"No account activity on page {page.page_number}, skipping")
+        return None
+    top = _find_activity_top(page)
+    if top is None:
+        # The heading was split differently in pdfplumber's characters; keep the whole page
+        return page.extract_text()
+    x0, page_top, x1, bottom = page.bbox
+    return page.crop((x0, max(page_top, top - 1), x1, bottom)).extract_text()
+
+def _extract_page_range(pdf_path, start, stop, crop_to_activity=False):
+    """Extract the text of pages [start, stop) of a PDF; runs in a page worker process."""
+    import pdfplumber
+    
+    with pdfplumber.open(pdf_path) as pdf:
+        texts = []
+        for page_num in range(start, stop):
+            logger.info(f"Processing page {page_num + 1} of {len(pdf.pages)}")
+            page = pdf.pages[page_num]
+            text = _extract_page_text(page, crop_to_activity)
+            page.close()
+            if text is not None:
+                texts.append(text)
+        return texts
+
+def peak_memory_mb():
+    """
+    Return the peak resident set size of this process and its children in MB.
+    
+    Returns:
+        Peak memory in MB, or None where the resource module is unavailable
+    """
+    if resource is None:
+        return None
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    if sys.platform == 'darwin':
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+def _collect_into(items, collected):
+    """Yield items unchanged while appending each one to collected."""
+    for item in items:
+        collected.append(item)
+        yield item
+
+def _write_statement_outputs(processor, pdf_path, output_path, transactions, results, metrics,
+                             validate_path=None, cache=None, cache_key=None, parsed=None, sqlite_path=None):
+    """Write a statement's transactions to CSV, then cache, store and validate them as requested.
+    
+    Args:
+        processor: ChaseStatementProcessor instance
+        pdf_path: Path to the PDF file
+        output_path: Path to write CSV output
+        transactions: Iterable of Transaction records, consumed once by the CSV writer
+        results: Processing results dictionary, updated in place
+        metrics: PipelineMetrics charged with the write and validation time, or None
+        validate_path: Optional path to Chase CSV for validation
+        cache: Optional StatementCache
+        cache_key: Cache key to store parsed under, or None to leave the cache alone
+        parsed: List that holds every transaction once the CSV is written, or None
+        sqlite_path: Optional SQLite database to also store the transactions in
+    """
+    logger.info(f"Writing to CSV: {output_path}")
+    count = processor.stream_to_csv(transactions, output_path, metrics)
+    logger.info(f"Found {count} transactions")
+    results['transactions'] = count
+    results['success'] = True
+    if parsed is not None and cache_key is not None:
+        cache.put(cache_key, parsed, source=pdf_path)
+    
+    # Store in the database, keyed by the PDF contents so reruns replace the statement
+    if sqlite_path:
+        statement_id = StatementCache.file_hash(pdf_path)
+        stored = parsed if parsed is not None else transactions
+        if not processor.export_to_sqlite(stored, sqlite_path, statement_id, source_path=pdf_path,
+                                          statement_date=infer_statement_date(pdf_path)):
+            results['success'] = False
+    
+    # Validate if requested
+    if validate_path:
+        logger.info(f"Validating against: {validate_path}")
+        with _timed(metrics, 'validate'):
+            validation_results = processor.validate_against_chase_csv(output_path, validate_path)
+        results['validation'] = validation_results
+        _log_validation_results(validation_results)
+
+def _log_validation_results(validation_results):
+    """Log the outcome of validate_against_chase_csv(), with the first few mismatches."""
+    if validation_results['is_valid']:
+        logger.info("Validation successful! All transactions match.")
+    else:
+        if validation_results['missing_in_ours']:
+            logger.warning(f"Found {len(validation_results['missing_in_ours'])} transactions in Chase's CSV that are missing in ours")
+            for tx in validation_results['missing_in_ours'][:5]:  # Show first 5 only
+                logger.warning(f"Missing: {tx}")
+        
+        if validation_results['missing_in_chase']:
+            logger.warning(f"Found {len(validation_results['missing_in_chase'])} transactions in our CSV that are missing in Chase's")
+            for tx in validation_results['missing_in_chase'][:5]:  # Show first 5 only
+                logger.warning(f"Extra: {tx}")
+    
+    reconciled = validation_results.get('reconciled')
+    if reconciled:
+        logger.info(f"Reconciled {len(reconciled)} transactions that differ slightly between the CSVs")
+        for pair in sorted(reconciled, key=lambda p: p['confidence'])[:5]:  # Show the 5 least certain
+            logger.info(f"Reconciled with confidence {pair['confidence']:.2f}: "
+                        f"{pair['ours']['Transaction Date']} {pair['ours']['Description']!r} ~ "
+                        f"{pair['chase']['Transaction Date']} {pair['chase']['Description']!r}")
+
+def process_statement(processor, pdf_path, output_path, validate_path=None, cache=None, sqlite_path=None):
     """Process a single statement and generate CSV output.
     
     Args:
@@ -449,6 +2758,8 @@ def process_statement(processor, pdf_path, output_path, validate_path=None):
         pdf_path: Path to the PDF file
         output_path: Path to write CSV output
         validate_path: Optional path to Chase CSV for validation
+        cache: Optional StatementCache to reuse previously extracted transactions
+        sqlite_path: Optional SQLite database to also store the transactions in
         
     Returns:
         Dictionary with processing results
@@ -456,47 +2767,554 @@ def process_statement(processor, pdf_path, output_path, validate_path=None):
     results = {
         'success': False,
         'transactions': 0,
-        'validation': None
+        'validation': None,
+        'cache_hit': None,
+        'metrics': None,
+        'category_cache': None
     }
+    metrics = processor.metrics
+    category_cache = processor.category_cache
+    if category_cache is not None:
+        hits, misses = category_cache.hits, category_cache.misses
     
     try:
-        # Parse the statement
+        # Parse the statement, unless an unchanged copy is already cached; the
+        # cache key covers the rules, so pick up edits to the rules file first
         logger.info(f"Processing statement: {pdf_path}")
-        transactions = processor.parse_pdf(pdf_path)
-        logger.info(f"Found {len(transactions)} transactions")
-        results['transactions'] = len(transactions)
-        
-        # Write to CSV
-        logger.info(f"Writing to CSV: {output_path}")
-        if processor.export_to_csv(transactions, output_path):
-            results['success'] = True
-        
-        # Validate if requested
-        if validate_path:
-            logger.info(f"Validating against: {validate_path}")
-            validation_results = processor.validate_against_chase_csv(output_path, validate_path)
-            results['validation'] = validation_results
-            
-            if validation_results['is_valid']:
-                logger.info("Validation successful! All transactions match.")
-            else:
-                if validation_results['missing_in_ours']:
-                    logger.warning(f"Found {len(validation_results['missing_in_ours'])} transactions in Chase's CSV that are missing in ours")
-                    for tx in validation_results['missing_in_ours'][:5]:  # Show first 5 only
-                        logger.warning(f"Missing: {tx}")
-                    
-                if validation_results['missing_in_chase']:
-                    logger.warning(f"Found {len(validation_results['missing_in_chase'])} transactions in our CSV that are missing in Chase's")
-                    for tx in validation_results['missing_in_chase'][:5]:  # Show first 5 only
-                        logger.warning(f"Extra: {tx}")
+        processor.reload_rules_if_changed()
+        transactions = None
+        parsed = None
+        cache_key = None
+        if cache is not None:
+            cache_key = cache.key_for(pdf_path, processor)
+            transactions = cache.get(cache_key)
+            results['cache_hit'] = transactions is not None
+            if transactions is not None:
+                logger.info(f"Using cached transactions for {pdf_path}")
+        if transactions is None:
+            transactions = processor.iter_transactions(pdf_path)
+            if cache is not None or sqlite_path:
+                # Keep a copy of the streamed transactions for the cache and database
+                parsed = []
+                transactions = _collect_into(transactions, parsed)
+        
+        # Write to CSV as transactions are extracted, then store and validate them
+        _write_statement_outputs(processor, pdf_path, output_path, transactions, results, metrics,
+                                 validate_path, cache, cache_key, parsed, sqlite_path)
     
     except Exception as e:
         logger.error(f"Error processing statement {pdf_path}: {str(e)}")
         import traceback
         logger.error(traceback.format_exc())
     
+    # Hand this statement's metrics to the caller, which may be in another process
+    if metrics is not None:
+        metrics.count('statements')
+        metrics.count('transactions', results['transactions'])
+        results['metrics'] = metrics.as_dict()
+        metrics.reset()
+    
+    # Categorization cache lookups for this statement, as (hits, misses)
+    if category_cache is not None:
+        results['category_cache'] = (category_cache.hits - hits, category_cache.misses - misses)
+    
+    return results
+
+# Processor owned by each worker process in parallel mode
+_worker_processor = None
+
+def _init_worker(log_queue, debug, processor_options):
+    """Set up a worker process: route its log records to the parent and build a processor."""
+    global _worker_processor
+    import logging.handlers
+    
+    # Replace inherited handlers so records are only emitted by the parent's listener
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(logging.DEBUG if debug else logging.INFO)
+    
+    _worker_processor = ChaseStatementProcessor(debug=debug, **processor_options)
+
+@contextmanager
+def _worker_pool(workers, debug=False, processor_options=None):
+    """
+    Start a process pool whose workers each build a ChaseStatementProcessor.
+    
+    Log records from the workers are forwarded to the parent through a queue
+    and emitted by the parent's own handlers, so output is not interleaved
+    mid-line.
+    
+    Yields:
+        ProcessPoolExecutor whose tasks can use _worker_processor
+    """
+    import logging.handlers
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    
+    log_queue = multiprocessing.Queue()
+    listener = logging.handlers.QueueListener(log_queue, *logging.getLogger().handlers,
+                                              respect_handler_level=True)
+    listener.start()
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(log_queue, debug, processor_options or {})) as executor:
+            yield executor
+    finally:
+        listener.stop()
+
+def _process_statement_in_worker(pdf_path, output_path, validate_path, cache=None, sqlite_path=None):
+    """Run process_statement in a worker process with that worker's processor."""
+    result = process_statement(_worker_processor, pdf_path, output_path, validate_path, cache, sqlite_path)
+    # Workers have no shutdown hook, so persist the categorization cache after every statement;
+    # the last worker to finish wins, and every entry it writes is valid
+    _worker_processor.save_category_cache()
+    return result
+
+def _extract_statement_in_worker(pdf_path):
+    """
+    Extract a statement's page texts in a worker process, for the statement pipeline.
+    
+    With skip_inactive_pages, pages before the first section header are dropped
+    and extraction stops after the page that ends the account activity, as
+    iter_transactions would.
+    
+    Returns:
+        Tuple of (list of page texts, extraction metrics as a dictionary or None)
+    """
+    processor = _worker_processor
+    classifier = processor.line_classifier
+    texts = []
+    in_activity = False
+    page_texts = processor._iter_page_texts(pdf_path)
+    try:
+        for text in page_texts:
+            if processor.skip_inactive_pages:
+                in_activity = in_activity or classifier.find_section_header(text) is not None
+                if not in_activity:
+                    continue
+                texts.append(text)
+                if classifier.find_activity_end(text):
+                    break
+            else:
+                texts.append(text)
+    finally:
+        page_texts.close()
+    
+    metrics = processor.metrics
+    if metrics is None:
+        return texts, None
+    extract_metrics = metrics.as_dict()
+    metrics.reset()
+    return texts, extract_metrics
+
+def process_statements_parallel(jobs, workers, debug=False, processor_options=None):
+    """Process several statements across a pool of worker processes.
+    
+    Log records from the workers are forwarded to the parent through a queue
+    and emitted by the parent's own handlers, so output is not interleaved
+    mid-line. Each worker writes its own CSV exactly as the serial path does.
+    
+    Args:
+        jobs: List of (pdf_path, output_path, validate_path, cache, sqlite_path) tuples
+        workers: Number of worker processes
+        debug: Enable debug logging in the workers
+        processor_options: Optional keyword arguments for each worker's ChaseStatementProcessor
+        
+    Returns:
+        List of processing results, in the same order as jobs
+    """
+    with _worker_pool(workers, debug, processor_options) as executor:
+        futures = [executor.submit(_process_statement_in_worker, *job) for job in jobs]
+        return [future.result() for future in futures]
+
+
+# Description -> category memo of each recategorize worker, shared by the files it handles
+_worker_categories = {}
+
+def _recategorize_file(processor, csv_path, output_path, categories):
+    """
+    Run recategorize_csv on one file of a bulk run, logging a failure instead of raising.
+    
+    Returns:
+        Tuple of (rows written, rows whose category changed), or None if the file failed
+    """
+    try:
+        return processor.recategorize_csv(csv_path, output_path, categories=categories)
+    except Exception as e:
+        import traceback
+        logger.error(f"Error recategorizing {csv_path}: {str(e)}")
+        logger.error(traceback.format_exc())
+        return None
+
+def _recategorize_in_worker(csv_path, output_path):
+    """Run recategorize_csv in a worker process with that worker's processor and memo."""
+    return _recategorize_file(_worker_processor, csv_path, output_path, _worker_categories)
+
+def recategorize_csvs(processor, jobs, workers=1, debug=False, processor_options=None):
+    """
+    Recategorize many CSV files, optionally across a pool of worker processes.
+    
+    Every worker keeps its own memo of categorized descriptions, and files are
+    handed out in batches, so an archive of thousands of small files is
+    mostly spent reading and writing rows rather than on categorization or
+    task overhead. A file that cannot be recategorized, such as a CSV
+    without the expected columns, is logged and skipped.
+    
+    Args:
+        processor: ChaseStatementProcessor used when workers is 1
+        jobs: List of (csv_path, output_path or None) tuples
+        workers: Number of worker processes
+        debug: Enable debug logging in the workers
+        processor_options: Keyword arguments for each worker's ChaseStatementProcessor,
+            which must select the same rules as processor
+        
+    Returns:
+        List of (rows written, rows whose category changed), or None for a file
+        that failed, in the same order as jobs
+    """
+    if workers <= 1 or len(jobs) <= 1:
+        categories = {}
+        return [_recategorize_file(processor, csv_path, output_path, categories)
+                for csv_path, output_path in jobs]
+    
+    workers = min(workers, len(jobs))
+    batch = max(1, len(jobs) // (workers * 8))
+    with _worker_pool(workers, debug, processor_options) as executor:
+        return list(executor.map(_recategorize_in_worker, [csv_path for csv_path, _ in jobs],
+                                 [output_path for _, output_path in jobs], chunksize=batch))
+
+def run_statement_pipeline(processor, jobs, workers=1, debug=False, processor_options=None, queue_size=2):
+    """Process statements through an asyncio pipeline whose stages overlap.
+    
+    Each statement passes through four stages connected by bounded queues:
+    loading (hashing the PDF and looking it up in the cache, on an I/O
+    thread), page text extraction in worker processes, parsing and
+    categorization with this process's processor, and writing the CSV,
+    cache entry, database rows and validation on a writer thread. While
+    statement N is being written, statement N+1 is parsed and later ones are
+    extracted. A full queue stalls the stage feeding it, so at most about
+    queue_size statements wait between any two stages however many PDFs
+    there are.
+    
+    Args:
+        processor: ChaseStatementProcessor used for parsing, categorization and output
+        jobs: List of (pdf_path, output_path, validate_path, cache, sqlite_path) tuples
+        workers: Number of extraction worker processes
+        debug: Enable debug logging in the workers
+        processor_options: Optional keyword arguments for each worker's ChaseStatementProcessor
+        queue_size: Maximum number of statements waiting between two stages
+        
+    Returns:
+        List of processing results, in the same order as jobs
+    """
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+    
+    with _worker_pool(workers, debug, processor_options) as extract_pool, \
+            ThreadPoolExecutor(max_workers=1) as load_pool, ThreadPoolExecutor(max_workers=1) as write_pool:
+        return asyncio.run(_statement_pipeline(processor, jobs, workers, queue_size,
+                                               load_pool, extract_pool, write_pool))
+
+def _log_statement_error(pdf_path):
+    """Log the exception being handled for a statement, with its traceback, and carry on."""
+    import traceback
+    logger.error(f"Error processing statement {pdf_path}: {str(sys.exc_info()[1])}")
+    logger.error(traceback.format_exc())
+
+async def _statement_pipeline(processor, jobs, workers, queue_size, load_pool, extract_pool, write_pool):
+    """Run the stages of run_statement_pipeline() concurrently and collect their results."""
+    import asyncio
+    
+    loop = asyncio.get_running_loop()
+    results = [None] * len(jobs)
+    to_extract = asyncio.Queue(maxsize=queue_size)
+    to_parse = asyncio.Queue(maxsize=queue_size)
+    to_write = asyncio.Queue(maxsize=queue_size)
+    collect_metrics = processor.metrics is not None
+    category_cache = processor.category_cache
+    
+    async def load():
+        for index, (pdf_path, output_path, validate_path, cache, sqlite_path) in enumerate(jobs):
+            logger.info(f"Processing statement: {pdf_path}")
+            item = {
+                'index': index,
+                'job': jobs[index],
+                'results': {'success': False, 'transactions': 0, 'validation': None, 'cache_hit': None,
+                            'metrics': None, 'category_cache': None},
+                'metrics': PipelineMetrics() if collect_metrics else None,
+                'cache_key': None,
+                'rules_version': None,
+                'extraction': None,
+                'transactions': None,
+                'failed': False
+            }
+            try:
+                # The cache key covers the rules, so pick up edits to the rules file first
+                processor.reload_rules_if_changed()
+                item['rules_version'] = processor.rules_version()
+                if cache is not None:
+                    item['cache_key'] = await loop.run_in_executor(load_pool, cache.key_for, pdf_path, processor)
+                    transactions = await loop.run_in_executor(load_pool, cache.get, item['cache_key'])
+                    item['results']['cache_hit'] = transactions is not None
+                    if transactions is not None:
+                        logger.info(f"Using cached transactions for {pdf_path}")
+                        item['transactions'] = transactions
+            except Exception:
+                _log_statement_error(pdf_path)
+                item['failed'] = True
+            await to_extract.put(item)
+        await to_extract.put(None)
+    
+    async def extract():
+        # Up to one statement per worker is extracted at a time; results are passed on in job order
+        in_flight = deque()
+        
+        async def finish(item):
+            if item['extraction'] is not None:
+                try:
+                    texts, extract_metrics = await item['extraction']
+                    item['extraction'] = texts
+                    if extract_metrics is not None:
+                        item['metrics'].merge(extract_metrics)
+                except Exception:
+                    _log_statement_error(item['job'][0])
+                    item['extraction'] = None
+                    item['failed'] = True
+            await to_parse.put(item)
+        
+        while (item := await to_extract.get()) is not None:
+            if not item['failed'] and item['transactions'] is None:
+                item['extraction'] = loop.run_in_executor(extract_pool, _extract_statement_in_worker, item['job'][0])
+            in_flight.append(item)
+            if len(in_flight) >= workers:
+                await finish(in_flight.popleft())
+        while in_flight:
+            await finish(in_flight.popleft())
+        await to_parse.put(None)
+    
+    async def parse():
+        while (item := await to_parse.get()) is not None:
+            if not item['failed'] and item['transactions'] is None:
+                if category_cache is not None:
+                    hits, misses = category_cache.hits, category_cache.misses
+                try:
+                    item['transactions'] = list(processor.transactions_from_page_texts(item['extraction']))
+                    if collect_metrics:
+                        item['metrics'].merge(processor.metrics.as_dict())
+                    if processor.rules_version() != item['rules_version']:
+                        # Categorized with rules newer than the cache key
+                        item['cache_key'] = None
+                except Exception:
+                    _log_statement_error(item['job'][0])
+                    item['failed'] = True
+                finally:
+                    if collect_metrics:
+                        processor.metrics.reset()
+                item['extraction'] = None
+                if category_cache is not None:
+                    item['results']['category_cache'] = (category_cache.hits - hits, category_cache.misses - misses)
+            elif item['transactions'] is not None:
+                # Cache hits were parsed when they were stored
+                item['cache_key'] = None
+            await to_write.put(item)
+        await to_write.put(None)
+    
+    def write_outputs(item):
+        pdf_path, output_path, validate_path, cache, sqlite_path = item['job']
+        transactions = item['transactions']
+        try:
+            _write_statement_outputs(processor, pdf_path, output_path, transactions, item['results'],
+                                     item['metrics'], validate_path, cache, item['cache_key'],
+                                     transactions if item['cache_key'] is not None else None, sqlite_path)
+        except Exception:
+            _log_statement_error(pdf_path)
+    
+    async def write():
+        while (item := await to_write.get()) is not None:
+            if not item['failed']:
+                await loop.run_in_executor(write_pool, write_outputs, item)
+            results[item['index']] = item['results']
+            metrics = item['metrics']
+            if metrics is not None:
+                metrics.count('statements')
+                metrics.count('transactions', item['results']['transactions'])
+                item['results']['metrics'] = metrics.as_dict()
+    
+    await asyncio.gather(load(), extract(), parse(), write())
     return results
 
+
+class StatementWatcher:
+    """
+    Long-running loop that processes new or modified statement PDFs in a directory.
+
+    The directory is polled, so no file system notification library is needed,
+    and the processor with its compiled rules stays in memory between
+    statements. A PDF is only processed once its size and modification time
+    have stayed the same for settle_seconds, so files still being downloaded or
+    copied are left alone. The size and modification time of each handled PDF
+    are recorded in a JSON state file, so a restarted watcher skips statements
+    it has already processed; a PDF that failed is retried once it changes.
+    """
+
+    def __init__(self, processor, statements_dir, output_dir, state_path, validate_path=None,
+                 cache=None, sqlite_path=None, poll_interval=2.0, settle_seconds=5.0):
+        """
+        Initialize the watcher.
+
+        Args:
+            processor: ChaseStatementProcessor used for every statement
+            statements_dir: Directory to watch for PDFs
+            output_dir: Directory for output CSV files
+            state_path: JSON file recording the PDFs already handled
+            validate_path: Optional Chase CSV to validate each statement against
+            cache: Optional StatementCache
+            sqlite_path: Optional SQLite database to also store transactions in
+            poll_interval: Seconds between directory scans
+            settle_seconds: Seconds a PDF must stay unchanged before it is processed
+        """
+        self.processor = processor
+        self.statements_dir = statements_dir
+        self.output_dir = output_dir
+        self.state_path = state_path
+        self.validate_path = validate_path
+        self.cache = cache
+        self.sqlite_path = sqlite_path
+        self.poll_interval = poll_interval
+        self.settle_seconds = settle_seconds
+        self.state = self._load_state()
+        self._pending = {}  # Path -> (size, mtime_ns, monotonic time first seen with them)
+
+    def _load_state(self):
+        """Read the state file, or start empty if it is missing or unreadable."""
+        try:
+            with open(self.state_path, 'r') as f:
+                return json.load(f)['statements']
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable watch state {self.state_path}: {str(e)}")
+            return {}
+
+    def _save_state(self):
+        """Write the state file under a temporary name and rename it into place."""
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'statements': self.state}, f, indent=1)
+        os.replace(tmp_path, self.state_path)
+
+    def ready_statements(self):
+        """
+        Scan the directory for PDFs that are new or changed and have settled.
+
+        A PDF settles once it has been seen with the same size and modification
+        time for settle_seconds. One whose modification time is already that old
+        when first seen, e.g. the backlog after a restart, is ready at once.
+
+        Returns:
+            Sorted list of PDF paths to process
+        """
+        now = time.monotonic()
+        wall_now = time.time()
+        ready = []
+        seen = set()
+        for entry in os.scandir(self.statements_dir):
+            if not entry.name.lower().endswith('.pdf'):
+                continue
+            try:
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+            except OSError:
+                continue  # Removed since the directory was listed
+            path = os.path.abspath(entry.path)
+            seen.add(path)
+
+            recorded = self.state.get(path)
+            if recorded and recorded['size'] == stat.st_size and recorded['mtime_ns'] == stat.st_mtime_ns:
+                self._pending.pop(path, None)
+                continue
+
+            pending = self._pending.get(path)
+            if pending is None or pending[:2] != (stat.st_size, stat.st_mtime_ns):
+                # New, or still being written
+                self._pending[path] = (stat.st_size, stat.st_mtime_ns, now)
+                if wall_now - stat.st_mtime >= self.settle_seconds:
+                    ready.append(path)
+            elif now - pending[2] >= self.settle_seconds:
+                ready.append(path)
+
+        # Forget PDFs that disappeared before settling
+        for path in list(self._pending):
+            if path not in seen:
+                del self._pending[path]
+        return sorted(ready)
+
+    def process_ready(self):
+        """
+        Process every settled new or changed PDF once.
+
+        Returns:
+            List of process_statement results, in processing order
+        """
+        results = []
+        for pdf_path in self.ready_statements():
+            try:
+                stat = os.stat(pdf_path)
+            except OSError:
+                continue
+            base_name = os.path.splitext(os.path.basename(pdf_path))[0]
+            output_path = os.path.join(self.output_dir, f"{base_name}.csv")
+            result = process_statement(self.processor, pdf_path, output_path, self.validate_path,
+                                       self.cache, self.sqlite_path)
+            results.append(result)
+            if not result['success']:
+                logger.warning(f"Failed to process {pdf_path}; it will be retried once it changes")
+
+            # Record the statement as handled so a restart does not repeat it
+            self._pending.pop(pdf_path, None)
+            self.state[pdf_path] = {
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'success': result['success'],
+                'transactions': result['transactions'],
+                'output_path': output_path,
+                'processed_at': datetime.now().isoformat(timespec='seconds')
+            }
+            self._save_state()
+
+        if results:
+            self.processor.save_category_cache()
+            if self.cache is not None:
+                self.cache.evict()
+        return results
+
+    def run(self, max_cycles=None):
+        """
+        Poll the directory until interrupted.
+
+        Args:
+            max_cycles: Optional number of scans after which to stop
+
+        Returns:
+            Exit code 0
+        """
+        logger.info(f"Watching {self.statements_dir} for new statements every {self.poll_interval:g}s "
+                    f"({len(self.state)} already processed)")
+        cycles = 0
+        try:
+            while True:
+                self.process_ready()
+                cycles += 1
+                if max_cycles is not None and cycles >= max_cycles:
+                    break
+                time.sleep(self.poll_interval)
+        except KeyboardInterrupt:
+            logger.info("Stopped watching")
+        return 0
+
 def main():
     """Main entry point for the script."""
     parser = argparse.ArgumentParser(description='Process Chase credit card statements')
@@ -506,18 +3324,245 @@ def main():
                         default='.')
     parser.add_argument('--validate', '-v', help='Chase CSV file to validate against')
     parser.add_argument('--debug', action='store_true', help='Enable debug logging')
+    parser.add_argument('--reconcile_days', type=int,
+                        help='When validating, also pair rows whose descriptions differ slightly '
+                             'and whose dates are up to this many days apart')
     parser.add_argument('--single', '-s', help='Process a single PDF file instead of a directory')
+    parser.add_argument('--workers', '-w', type=int, default=1,
+                        help='Number of worker processes for a directory of PDFs or for recategorize (default: 1)')
+    parser.add_argument('--page_workers', type=int, default=1,
+                        help='Number of worker processes extracting pages within each statement when '
+                             'statements are processed one at a time (default: 1)')
+    parser.add_argument('--pipeline', action='store_true',
+                        help='Overlap loading, extraction, categorization and writing of a directory of PDFs; '
+                             'extraction runs in --workers processes')
+    parser.add_argument('--queue_size', type=int, default=2,
+                        help='Statements buffered between pipeline stages with --pipeline (default: 2)')
+    parser.add_argument('--low_memory', action='store_true',
+                        help="Release each page's cached layout objects once its text is extracted")
+    parser.add_argument('--skip_inactive_pages', action='store_true',
+                        help='Skip pages before the first section header and after the end of the account activity')
+    parser.add_argument('--crop_activity', action='store_true',
+                        help='Extract text only from the account activity region, skipping pages without it')
+    parser.add_argument('--ledger',
+                        help='Also merge the processed statements into this date-sorted CSV, '
+                             'dropping transactions repeated across statements')
+    parser.add_argument('--columnar',
+                        help='Also write the transactions of all processed statements to this '
+                             'memory-mapped columnar file')
+    parser.add_argument('--sqlite', help='Also store transactions in this SQLite database')
+    parser.add_argument('--metrics', action='store_true',
+                        help='Record per-stage timings and counters and log them in the summary')
+    parser.add_argument('--metrics_json', help='Write per-stage timings and counters to this JSON file')
+    parser.add_argument('--profile', help='Write a cProfile dump of the run to this file '
+                                          '(worker processes are not profiled)')
+    parser.add_argument('--no-cache', dest='use_cache', action='store_false',
+                        help='Always re-parse PDFs instead of using cached transactions')
+    parser.add_argument('--cache_dir', help='Directory for cached parse results',
+                        default=os.path.join(os.path.expanduser('~'), '.cache', 'chase_statement_parser'))
+    parser.add_argument('--cache_max_entries', type=int, default=1000,
+                        help='Maximum number of cached statements to keep (default: 1000)')
+    parser.add_argument('--cache_max_age', type=int, default=365,
+                        help='Evict cached statements unused for this many days (default: 365)')
+    parser.add_argument('--watch', action='store_true',
+                        help='Keep running and process new or modified PDFs in --statements_dir as they appear')
+    parser.add_argument('--watch_interval', type=float, default=2.0,
+                        help='Seconds between directory scans in watch mode (default: 2)')
+    parser.add_argument('--settle_seconds', type=float, default=5.0,
+                        help='Seconds a PDF must stay unchanged before watch mode processes it (default: 5)')
+    parser.add_argument('--watch_state', help='State file recording the PDFs watch mode has processed '
+                                              '(default: .watch_state.json in --output_dir)')
+    parser.add_argument('--rules', help='JSON, TOML or YAML file of category keywords to use instead of the '
+                                        'built-in ones; reloaded when it changes')
+    parser.add_argument('--write_rules', help='Write the category keywords in effect to this JSON file and exit')
+    parser.add_argument('--category_cache', help='JSON file persisting categorized merchants between runs')
+    parser.add_argument('--category_cache_size', type=int, default=10000,
+                        help='Merchants kept in the categorization cache, 0 to disable it (default: 10000)')
+    
+    subparsers = parser.add_subparsers(dest='command',
+                                       help='Optional command; without one, statements are processed')
+    analyze_parser = subparsers.add_parser('analyze', help='Write spending summary CSVs for extracted transactions')
+    analyze_parser.add_argument('inputs', nargs='*',
+                                help='Transaction CSV files or directories of them (default: --output_dir)')
+    analyze_parser.add_argument('--from_sqlite', help='Read transactions from this SQLite database instead of CSVs')
+    analyze_parser.add_argument('--from_columnar', help='Read transactions from this columnar file instead of CSVs')
+    analyze_parser.add_argument('--summary_dir', default='summaries',
+                                help='Directory for the summary CSV files (default: summaries)')
+    analyze_parser.add_argument('--top', type=int, default=20,
+                                help='Number of merchants in top_merchants.csv (default: 20)')
+    validate_parser = subparsers.add_parser('validate', help='Compare an extracted CSV with a Chase CSV; '
+                                                             'no PDF is opened')
+    validate_parser.add_argument('ours', help='CSV written by this script')
+    validate_parser.add_argument('chase', help="Chase's downloaded CSV")
+    recategorize_parser = subparsers.add_parser('recategorize', help='Re-run categorization over extracted CSVs '
+                                                                     'with the current rules; no PDF is opened')
+    recategorize_parser.add_argument('inputs', nargs='+', help='Transaction CSV files or directories of them')
+    recategorize_parser.add_argument('--dest_dir',
+                                     help='Write the recategorized CSVs here instead of replacing the inputs; '
+                                          'the inputs must have distinct file names')
+    # Also accepted after the command; SUPPRESS keeps the top-level value when they are not given here
+    recategorize_parser.add_argument('--workers', '-w', type=int, default=argparse.SUPPRESS,
+                                     help='Number of worker processes recategorizing files in parallel '
+                                          '(default: 1)')
+    recategorize_parser.add_argument('--rules', default=argparse.SUPPRESS,
+                                     help='JSON, TOML or YAML file of category keywords to use instead of '
+                                          'the built-in ones')
     
     args = parser.parse_args()
+    run = {'analyze': _run_analyze, 'validate': _run_validate,
+           'recategorize': _run_recategorize}.get(args.command, _run)
+    
+    if args.profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            return run(args)
+        finally:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+            logger.info(f"Wrote profile to {args.profile}")
+    return run(args)
+
+def _expand_csv_inputs(paths):
+    """
+    Expand CSV files and directories of them into a list of CSV paths.
+    
+    Returns:
+        List of paths, or None after logging an error if a path does not exist
+    """
+    csv_paths = []
+    for path in paths:
+        if os.path.isdir(path):
+            csv_paths.extend(os.path.join(path, f) for f in sorted(os.listdir(path))
+                             if f.lower().endswith('.csv'))
+        elif os.path.exists(path):
+            csv_paths.append(path)
+        else:
+            logger.error(f"File not found: {path}")
+            return None
+    return csv_paths
+
+def _run_analyze(args):
+    """Write spending summaries for the transactions selected by the analyze command."""
+    try:
+        import spending_analytics
+    except ImportError as e:
+        logger.error(f"The analyze command requires NumPy: {e}")
+        return 1
+    
+    start = time.perf_counter()
+    if args.from_sqlite:
+        with TransactionStore(args.from_sqlite) as store:
+            table = spending_analytics.TransactionTable.from_transactions(store.transactions())
+    elif args.from_columnar:
+        table = spending_analytics.TransactionTable.from_columnar(args.from_columnar)
+    else:
+        csv_paths = _expand_csv_inputs(args.inputs or [args.output_dir])
+        if csv_paths is None:
+            return 1
+        logger.info(f"Loading transactions from {len(csv_paths)} CSV files")
+        table = spending_analytics.TransactionTable.from_csv_files(csv_paths)
+    loaded = time.perf_counter()
+    
+    spending_analytics.write_summaries(table, args.summary_dir, top_count=args.top)
+    logger.info(f"Loaded {len(table)} transactions in {(loaded - start) * 1000:.1f} ms, "
+                f"summarized in {(time.perf_counter() - loaded) * 1000:.1f} ms")
+    return 0
+
+def _run_validate(args):
+    """Validate an extracted CSV against Chase's CSV; exits non-zero on any mismatch."""
+    processor = ChaseStatementProcessor(debug=args.debug, category_cache_size=0,
+                                        reconcile_days=args.reconcile_days)
+    for path in (args.ours, args.chase):
+        if not os.path.exists(path):
+            logger.error(f"File not found: {path}")
+            return 1
+    validation_results = processor.validate_against_chase_csv(args.ours, args.chase)
+    _log_validation_results(validation_results)
+    return 0 if validation_results['is_valid'] else 1
+
+def _run_recategorize(args):
+    """Recategorize the CSV files selected by the recategorize command; exits non-zero if any file failed."""
+    processor = ChaseStatementProcessor(debug=args.debug, category_cache_size=args.category_cache_size,
+                                        category_cache_path=args.category_cache, rules_path=args.rules)
+    csv_paths = _expand_csv_inputs(args.inputs)
+    if csv_paths is None:
+        return 1
+    # A file listed twice, e.g. on its own and through its directory, is recategorized once
+    csv_paths = list({os.path.abspath(path): path for path in csv_paths}.values())
+    if args.dest_dir:
+        # Files from different directories would be written to the same output
+        names = Counter(os.path.basename(path) for path in csv_paths)
+        clashes = sorted(name for name, count in names.items() if count > 1)
+        if clashes:
+            logger.error(f"Several inputs are named {', '.join(clashes)}; --dest_dir would write them "
+                         "to the same file. Recategorize them in separate runs or without --dest_dir")
+            return 1
+        os.makedirs(args.dest_dir, exist_ok=True)
+    
+    start = time.perf_counter()
+    jobs = [(csv_path, os.path.join(args.dest_dir, os.path.basename(csv_path)) if args.dest_dir else None)
+            for csv_path in csv_paths]
+    processor_options = {'category_cache_size': args.category_cache_size, 'rules_path': args.rules}
+    counts = recategorize_csvs(processor, jobs, args.workers, args.debug, processor_options)
+    processor.save_category_cache()
+    succeeded = [count for count in counts if count is not None]
+    rows = sum(written for written, _ in succeeded)
+    changed = sum(changed for _, changed in succeeded)
+    logger.info(f"Recategorized {len(succeeded)}/{len(csv_paths)} CSV files in "
+                f"{time.perf_counter() - start:.2f} s: {changed} of {rows} categories changed, "
+                f"{sum(1 for _, file_changed in succeeded if file_changed)} files updated")
+    failed = len(csv_paths) - len(succeeded)
+    if failed:
+        logger.error(f"{failed} CSV files could not be recategorized")
+        return 1
+    return 0
+
+def _run(args):
+    """Process statements as configured by the parsed command-line arguments."""
+    collect_metrics = args.metrics or args.metrics_json is not None
     
     # Create processor
-    processor = ChaseStatementProcessor(debug=args.debug)
+    processor = ChaseStatementProcessor(debug=args.debug, page_workers=args.page_workers,
+                                        low_memory=args.low_memory,
+                                        skip_inactive_pages=args.skip_inactive_pages,
+                                        crop_to_activity=args.crop_activity,
+                                        metrics=PipelineMetrics() if collect_metrics else None,
+                                        category_cache_size=args.category_cache_size,
+                                        category_cache_path=args.category_cache,
+                                        rules_path=args.rules, reconcile_days=args.reconcile_days)
+    
+    if args.write_rules:
+        write_category_rules(processor.category_keywords, args.write_rules)
+        logger.info(f"Wrote category rules to {args.write_rules}")
+        return 0
+    
+    # Open the parse cache
+    cache = None
+    if args.use_cache:
+        cache = StatementCache(args.cache_dir, max_entries=args.cache_max_entries,
+                               max_age_days=args.cache_max_age)
+    
+    # Keep processing new statements as they arrive
+    if args.watch:
+        if not os.path.isdir(args.statements_dir):
+            logger.error(f"Directory not found: {args.statements_dir}")
+            return 1
+        os.makedirs(args.output_dir, exist_ok=True)
+        state_path = args.watch_state or os.path.join(args.output_dir, '.watch_state.json')
+        watcher = StatementWatcher(processor, args.statements_dir, args.output_dir, state_path,
+                                   validate_path=args.validate, cache=cache, sqlite_path=args.sqlite,
+                                   poll_interval=args.watch_interval, settle_seconds=args.settle_seconds)
+        return watcher.run()
     
     # Track overall results
     results = {
         'total_statements': 0,
         'successful_statements': 0,
-        'total_transactions': 0
+        'total_transactions': 0,
+        'cache_hits': 0,
+        'cache_misses': 0
     }
     
     try:
@@ -534,7 +3579,10 @@ def main():
             output_path = os.path.join(args.output_dir, f"{base_name}.csv")
             
             # Process the PDF
-            result = process_statement(processor, pdf_path, output_path, args.validate)
+            result = process_statement(processor, pdf_path, output_path, args.validate, cache, args.sqlite)
+            statement_results = [result]
+            output_paths = [output_path]
+            processor.save_category_cache()
             
             # Update results
             results['total_statements'] = 1
@@ -562,26 +3610,104 @@ def main():
             logger.info(f"Found {len(pdf_files)} PDF files to process")
             results['total_statements'] = len(pdf_files)
             
-            # Process each PDF
+            # Generate input and output paths for each PDF
+            jobs = []
             for pdf_file in pdf_files:
                 pdf_path = os.path.join(statements_dir, pdf_file)
-                
-                # Generate output filename
                 base_name = os.path.splitext(pdf_file)[0]
                 output_path = os.path.join(args.output_dir, f"{base_name}.csv")
-                
-                # Process the PDF
-                result = process_statement(processor, pdf_path, output_path, args.validate)
-                
-                # Update results
+                jobs.append((pdf_path, output_path, args.validate, cache, args.sqlite))
+            output_paths = [job[1] for job in jobs]
+            
+            # Process the PDFs, in parallel if requested
+            if args.pipeline:
+                workers = max(1, min(args.workers, len(jobs)))
+                logger.info(f"Processing with a pipeline of {workers} extraction worker processes")
+                # Workers only extract page text; categorization stays in this process.
+                # Each worker extracts its statement's pages itself rather than starting
+                # a nested page pool of its own
+                processor_options = {'page_workers': 1,
+                                     'low_memory': args.low_memory,
+                                     'skip_inactive_pages': args.skip_inactive_pages,
+                                     'crop_to_activity': args.crop_activity,
+                                     'metrics': PipelineMetrics() if collect_metrics else None,
+                                     'category_cache_size': 0}
+                statement_results = run_statement_pipeline(processor, jobs, workers, args.debug,
+                                                           processor_options, args.queue_size)
+                processor.save_category_cache()
+            elif args.workers > 1 and len(jobs) > 1:
+                workers = min(args.workers, len(jobs))
+                logger.info(f"Processing with {workers} worker processes")
+                processor_options = {'low_memory': args.low_memory,
+                                     'skip_inactive_pages': args.skip_inactive_pages,
+                                     'crop_to_activity': args.crop_activity,
+                                     'metrics': PipelineMetrics() if collect_metrics else None,
+                                     'category_cache_size': args.category_cache_size,
+                                     'category_cache_path': args.category_cache,
+                                     'rules_path': args.rules,
+                                     'reconcile_days': args.reconcile_days}
+                statement_results = process_statements_parallel(jobs, workers, args.debug, processor_options)
+            else:
+                statement_results = [process_statement(processor, *job) for job in jobs]
+                processor.save_category_cache()
+            
+            # Update results
+            for result in statement_results:
                 if result['success']:
                     results['successful_statements'] += 1
                     results['total_transactions'] += result['transactions']
         
+        # Merge the statements that were written into one ledger
+        if args.ledger:
+            write_merged_ledger(processor, [path for path, result in zip(output_paths, statement_results)
+                                            if result['success']], args.ledger)
+        
+        # Archive the statements that were written in columnar form, oldest first
+        if args.columnar:
+            written = [path for path, result in zip(output_paths, statement_results) if result['success']]
+            ColumnarFile.write(((read_transactions_csv(path), statement_date)
+                                for statement_date, path in _date_statement_csvs(written)), args.columnar)
+        
+        # Count cache hits and misses, then trim the cache
+        if cache is not None:
+            for result in statement_results:
+                if result['cache_hit'] is True:
+                    results['cache_hits'] += 1
+                elif result['cache_hit'] is False:
+                    results['cache_misses'] += 1
+            cache.evict()
+        
         # Print overall results
-        logger.info(f"Processing completed. Summary:")
+        logger.info("Processing completed. Summary:")
         logger.info(f"  Statements processed: {results['successful_statements']}/{results['total_statements']}")
         logger.info(f"  Total transactions extracted: {results['total_transactions']}")
+        if cache is not None:
+            logger.info(f"  Cache hits/misses: {results['cache_hits']}/{results['cache_misses']}")
+        category_lookups = [result['category_cache'] for result in statement_results if result['category_cache']]
+        category_hits = sum(hits for hits, misses in category_lookups)
+        category_misses = sum(misses for hits, misses in category_lookups)
+        if category_hits + category_misses:
+            logger.info(f"  Categorization cache hit rate: "
+                        f"{category_hits / (category_hits + category_misses):.1%} "
+                        f"({category_hits} hits, {category_misses} misses)")
+        peak_memory = peak_memory_mb()
+        if peak_memory is not None:
+            logger.info(f"  Peak memory: {peak_memory:.1f} MB")
+        
+        # Combine the per-statement metrics, which may come from worker processes
+        if collect_metrics:
+            metrics = PipelineMetrics()
+            for result in statement_results:
+                if result['metrics'] is not None:
+                    metrics.merge(result['metrics'])
+            if args.metrics:
+                logger.info("  Metrics:")
+                for line in metrics.summary_lines():
+                    logger.info(f"    {line}")
+            if args.metrics_json:
+                with open(args.metrics_json, 'w') as f:
+                    json.dump(metrics.as_dict(), f, indent=2)
+                logger.info(f"Wrote metrics to {args.metrics_json}")
         
         return 0
     
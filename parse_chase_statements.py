@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+"""
+Command-line entry point for chase_statement_parser.
+
+Takes the same arguments as running chase_statement_parser.py directly, but
+starts faster: a script run directly is compiled on every run, while the
+imported module is compiled once and loaded from __pycache__ afterwards.
+"""
+from chase_statement_parser import main
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,312 @@
+"""
+Vectorized spending analytics over extracted Chase transactions.
+
+Transactions are loaded once into a columnar TransactionTable backed by NumPy
+arrays: dates as year/month/day integers, amounts as integer cents, and
+categories, types and merchants as integer codes into small lookup lists.
+Every aggregation is then a bincount, cumsum or sort over those arrays, so
+summaries over millions of rows take milliseconds.
+
+Requires NumPy.
+"""
+import csv
+import logging
+import os
+import re
+
+import numpy as np
+
+from chase_statement_parser import (ColumnarFile, Transaction, infer_statement_date, normalize_merchant,
+                                    read_transactions_csv)
+
+logger = logging.getLogger(__name__)
+
+# Types whose amounts reduce the balance
+CREDIT_TYPES = ('Payment', 'Return')
+
+_ISO_DATE = re.compile(r'(\d{4})-(\d{2})-(\d{2})$')
+_MONTH_DAY = re.compile(r'(\d{2})/(\d{2})$')
+
+
+class _Encoder:
+    """Assigns consecutive integer codes to distinct values."""
+
+    def __init__(self, values=()):
+        self.values = list(values)
+        self.codes = {value: code for code, value in enumerate(self.values)}
+
+    def encode(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class TransactionTable:
+    """
+    Columnar table of transactions.
+
+    Attributes:
+        year, month, day: int16/int8 date parts; year is 0 when unknown
+        amount_cents: int64 signed amounts, positive for charges
+        category_code, type_code, merchant_code: int32 codes
+        categories, types, merchants: Lists mapping codes back to strings
+    """
+
+    def __init__(self, year, month, day, amount_cents, category_code, type_code, merchant_code,
+                 categories, types, merchants):
+        self.year = year
+        self.month = month
+        self.day = day
+        self.amount_cents = amount_cents
+        self.category_code = category_code
+        self.type_code = type_code
+        self.merchant_code = merchant_code
+        self.categories = categories
+        self.types = types
+        self.merchants = merchants
+
+    def __len__(self):
+        return len(self.amount_cents)
+
+    @classmethod
+    def from_transactions(cls, transactions, statement_date=None):
+        """
+        Build a table from Transaction records as produced by parse_pdf.
+
+        Args:
+            transactions: Iterable of Transaction records or transaction dictionaries;
+                dates may be MM/DD or ISO
+            statement_date: Optional closing date giving MM/DD dates their year
+
+        Returns:
+            TransactionTable
+        """
+        categories = _Encoder()
+        types = _Encoder()
+        merchants = _Encoder()
+        years, months, days, cents = [], [], [], []
+        category_codes, type_codes, merchant_codes = [], [], []
+        for transaction in transactions:
+            if isinstance(transaction, dict):
+                transaction = Transaction.from_dict(transaction)
+            year, month, day = _split_date(transaction.date, statement_date)
+            years.append(year)
+            months.append(month)
+            days.append(day)
+            cents.append(transaction.amount_cents)
+            category_codes.append(categories.encode(transaction.category))
+            type_codes.append(types.encode(transaction.type))
+            merchant_codes.append(merchants.encode(normalize_merchant(transaction.description)))
+        return cls(np.array(years, dtype=np.int16), np.array(months, dtype=np.int8),
+                   np.array(days, dtype=np.int8), np.array(cents, dtype=np.int64),
+                   np.array(category_codes, dtype=np.int32), np.array(type_codes, dtype=np.int32),
+                   np.array(merchant_codes, dtype=np.int32),
+                   categories.values, types.values, merchants.values)
+
+    @classmethod
+    def from_csv_files(cls, csv_paths):
+        """
+        Build a table from CSV files written by export_to_csv.
+
+        The statement closing date is inferred from each file name, as for the PDFs.
+        """
+        return cls.concat([cls.from_transactions(read_transactions_csv(path), infer_statement_date(path))
+                           for path in csv_paths])
+
+    @classmethod
+    def from_columnar(cls, path):
+        """
+        Build a table from a file written by ColumnarFile.write().
+
+        The amounts are used in place from the mapped file and the dates are
+        split with datetime64 arithmetic, so no text is parsed; the mapping
+        stays open for as long as the table refers to it.
+        """
+        columnar = ColumnarFile(path)
+        days = columnar.numpy_column('day')
+        valid = days != ColumnarFile.NO_DAY
+        dates = np.where(valid, days, 0).astype('datetime64[D]')
+        months = dates.astype('datetime64[M]')
+        year = months.astype('datetime64[Y]').astype(np.int64) + 1970
+        year = np.where(valid & (year != ColumnarFile.UNKNOWN_YEAR), year, 0).astype(np.int16)
+        month = np.where(valid, months.astype(np.int64) % 12 + 1, 0).astype(np.int8)
+        day = np.where(valid, (dates - months).astype(np.int64) + 1, 0).astype(np.int8)
+        return cls(year, month, day, columnar.numpy_column('amount_cents'),
+                   columnar.numpy_column('category_code').astype(np.int32),
+                   columnar.numpy_column('type_code').astype(np.int32),
+                   columnar.numpy_column('merchant_code').astype(np.int32),
+                   list(columnar.categories), list(columnar.types), list(columnar.merchants))
+
+    @classmethod
+    def concat(cls, tables):
+        """Combine several tables, re-encoding their codes into shared lookup lists."""
+        if not tables:
+            return cls.from_transactions([])
+        categories, types, merchants = _Encoder(), _Encoder(), _Encoder()
+
+        def recode(encoder, values, codes):
+            mapping = np.array([encoder.encode(value) for value in values], dtype=np.int32)
+            return mapping[codes] if len(codes) else codes
+
+        return cls(np.concatenate([t.year for t in tables]), np.concatenate([t.month for t in tables]),
+                   np.concatenate([t.day for t in tables]),
+                   np.concatenate([t.amount_cents for t in tables]),
+                   np.concatenate([recode(categories, t.categories, t.category_code) for t in tables]),
+                   np.concatenate([recode(types, t.types, t.type_code) for t in tables]),
+                   np.concatenate([recode(merchants, t.merchants, t.merchant_code) for t in tables]),
+                   categories.values, types.values, merchants.values)
+
+    def type_mask(self, transaction_type):
+        """Boolean mask of rows with the given type, or all rows for None."""
+        if transaction_type is None:
+            return np.ones(len(self), dtype=bool)
+        if transaction_type not in self.types:
+            return np.zeros(len(self), dtype=bool)
+        return self.type_code == self.types.index(transaction_type)
+
+    def signed_cents(self):
+        """Amounts with payments and returns negative, whatever sign they were stored with."""
+        credit_codes = [self.types.index(t) for t in CREDIT_TYPES if t in self.types]
+        credits = np.isin(self.type_code, credit_codes)
+        return np.where(credits, -np.abs(self.amount_cents), self.amount_cents)
+
+    def date_order(self):
+        """Indices sorting the rows by date, keeping the original order for equal dates."""
+        keys = (self.year.astype(np.int64) * 10000 + self.month.astype(np.int64) * 100
+                + self.day.astype(np.int64))
+        return np.argsort(keys, kind='stable')
+
+    def category_totals(self, transaction_type='Purchase'):
+        """
+        Sum amounts per category.
+
+        Returns:
+            List of (category, total dollars, count), largest total first
+        """
+        mask = self.type_mask(transaction_type)
+        codes = self.category_code[mask]
+        totals = np.bincount(codes, weights=self.amount_cents[mask], minlength=len(self.categories))
+        counts = np.bincount(codes, minlength=len(self.categories))
+        order = np.argsort(-totals, kind='stable')
+        return [(self.categories[i], totals[i] / 100, int(counts[i])) for i in order if counts[i]]
+
+    def monthly_totals(self, transaction_type='Purchase'):
+        """
+        Sum amounts per month, split by category.
+
+        Returns:
+            Tuple of (month labels 'YYYY-MM', category names, 2-D array of dollars [month, category]);
+            only categories with matching rows are included, months with an
+            unknown year are labelled 'XXXX-MM', and rows without a date fall
+            under 'unknown'
+        """
+        mask = self.type_mask(transaction_type)
+        month = self.month[mask].astype(np.int64)
+        # Index 0 collects the rows whose date could not be parsed (month 0)
+        month_index = np.where(month > 0, self.year[mask].astype(np.int64) * 12 + month, 0)
+        # Month indices span a few thousand values, so a bincount finds the distinct ones without sorting
+        months = np.flatnonzero(np.bincount(month_index)) if len(month_index) else month_index
+        month_codes = np.zeros(months[-1] + 1 if len(months) else 0, dtype=np.int64)
+        month_codes[months] = np.arange(len(months))
+        month_codes = month_codes[month_index]
+        flat = month_codes * len(self.categories) + self.category_code[mask]
+        totals = np.bincount(flat, weights=self.amount_cents[mask],
+                             minlength=len(months) * len(self.categories))
+        totals = totals.reshape(len(months), len(self.categories))
+        used = np.unique(self.category_code[mask])
+        labels = ['unknown' if m == 0 else f"{(m - 1) // 12:04d}-{(m - 1) % 12 + 1:02d}" if m > 12
+                  else f"XXXX-{m:02d}" for m in months]
+        return labels, [self.categories[i] for i in used], totals[:, used] / 100
+
+    def running_balance(self):
+        """
+        Running balance over all transactions in date order, starting from zero.
+
+        Returns:
+            Tuple of (row order, balance in dollars after each of those rows)
+        """
+        order = self.date_order()
+        return order, np.cumsum(self.signed_cents()[order]) / 100
+
+    def top_merchants(self, count=20, transaction_type='Purchase'):
+        """
+        Merchants with the largest total spend.
+
+        Returns:
+            List of (merchant, total dollars, transaction count), largest first
+        """
+        mask = self.type_mask(transaction_type)
+        codes = self.merchant_code[mask]
+        totals = np.bincount(codes, weights=self.amount_cents[mask], minlength=len(self.merchants))
+        counts = np.bincount(codes, minlength=len(self.merchants))
+        count = min(count, int(np.count_nonzero(counts)))
+        if count <= 0:
+            return []
+        top = np.argpartition(-totals, count - 1)[:count]
+        top = top[np.argsort(-totals[top], kind='stable')]
+        return [(self.merchants[i], totals[i] / 100, int(counts[i])) for i in top]
+
+    def date_labels(self, rows):
+        """Format the dates of the given rows, as YYYY-MM-DD or MM/DD when the year is unknown."""
+        return [f"{y:04d}-{m:02d}-{d:02d}" if y else f"{m:02d}/{d:02d}"
+                for y, m, d in zip(self.year[rows].tolist(), self.month[rows].tolist(), self.day[rows].tolist())]
+
+
+def _split_date(value, statement_date):
+    """Split an ISO or MM/DD date into (year, month, day); year is 0 when unknown."""
+    match = _ISO_DATE.match(value)
+    if match:
+        return int(match.group(1)), int(match.group(2)), int(match.group(3))
+    match = _MONTH_DAY.match(value)
+    if not match:
+        return 0, 0, 0
+    month, day = int(match.group(1)), int(match.group(2))
+    year = 0
+    if statement_date is not None:
+        year = statement_date.year - 1 if month > statement_date.month else statement_date.year
+    return year, month, day
+
+
+def write_summaries(table, output_dir, top_count=20):
+    """
+    Write summary CSVs for a transaction table.
+
+    Writes category_totals.csv, monthly_totals.csv, top_merchants.csv and
+    running_balance.csv to output_dir.
+
+    Returns:
+        List of paths written
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+
+    def write(name, header, rows):
+        path = os.path.join(output_dir, name)
+        with open(path, 'w', newline='') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(header)
+            writer.writerows(rows)
+        paths.append(path)
+
+    write('category_totals.csv', ['Category', 'Total', 'Transactions'],
+          [(category, f"{total:.2f}", count) for category, total, count in table.category_totals()])
+
+    labels, categories, totals = table.monthly_totals()
+    write('monthly_totals.csv', ['Month'] + categories + ['Total'],
+          [[label] + [f"{value:.2f}" for value in row] + [f"{row.sum():.2f}"]
+           for label, row in zip(labels, totals)])
+
+    write('top_merchants.csv', ['Merchant', 'Total', 'Transactions'],
+          [(merchant, f"{total:.2f}", count) for merchant, total, count in table.top_merchants(top_count)])
+
+    order, balance = table.running_balance()
+    signed = table.signed_cents()[order] / 100
+    write('running_balance.csv', ['Date', 'Merchant', 'Type', 'Amount', 'Balance'],
+          zip(table.date_labels(order), [table.merchants[i] for i in table.merchant_code[order].tolist()],
+              [table.types[i] for i in table.type_code[order].tolist()],
+              [f"{value:.2f}" for value in signed.tolist()], [f"{value:.2f}" for value in balance.tolist()]))
+
+    logger.info(f"Wrote {len(paths)} summary files for {len(table)} transactions to {output_dir}")
+    return paths